@@ -1,7 +1,10 @@
+import itertools
 import streamlit as st
-from typing import Dict, List
+from typing import Dict, Iterator
 
-from main import run_turn
+from container import AppContainer, get_container
+from main import run_turn_stream
+from utils.sessions import Session, SessionStore, default_store
 from utils.tmdb import get_poster_url
 
 
@@ -19,26 +22,32 @@ st.caption("영화를 사랑하는 서로 다른 사람들이 모여 수다 떨
 
 
 # -------------------------
-# session state 초기화
+# 공유 리소스 (클라이언트/봇/캐시/HTTP 풀은 프로세스당 한 번)
 # -------------------------
-if "messages" not in st.session_state:
-    st.session_state.messages: List[Dict] = [] # type: ignore
+@st.cache_resource
+def load_container() -> AppContainer:
+    return get_container()
 
-if "context" not in st.session_state:
-    st.session_state.context = {}
 
-if "shown_posters" not in st.session_state:
-    st.session_state.shown_posters = set()
+@st.cache_resource
+def load_sessions() -> SessionStore:
+    return default_store()
 
-if "initialized" not in st.session_state:
-    st.session_state.initialized = False
+
+# -------------------------
+# 세션 (대화 상태는 서버 쪽 저장소에 - 최근 메시지만 메모리, 나머지는 보관소)
+# st.session_state에는 세션 id만
+# -------------------------
+store = load_sessions()
+session: Session = store.get(st.session_state.get("session_id", "")) or store.create()
+st.session_state.session_id = session.id
 
 
 # -------------------------
 # 초기 인사 (진행자)
 # -------------------------
-if not st.session_state.initialized:
-    st.session_state.messages.append({
+if not session.messages and not session.archived:
+    session.add_message({
         "role": "assistant",
         "speaker": "🎤 호스트",
         "text": (
@@ -49,12 +58,20 @@ if not st.session_state.initialized:
             "편하게 말 걸어줘! 누구한테 물어보고 싶은지도 같이 말해도 좋아 😊"
         )
     })
-    st.session_state.initialized = True
 
 
 # -------------------------
 # 메시지 렌더링
 # -------------------------
+def render_poster(movie_title: str | None):
+    # 🎬 포스터 표시 (movie_title 있을 때, 세션당 한 번)
+    if movie_title and movie_title not in session.shown_posters:
+        poster_url = get_poster_url(movie_title)
+        if poster_url:
+            st.image(poster_url, width=220)
+            session.shown_posters.append(movie_title)
+
+
 def render_message(msg: Dict):
     role = "assistant" if msg["role"] == "assistant" else "user"
 
@@ -62,22 +79,41 @@ def render_message(msg: Dict):
         if msg.get("speaker"):
             st.markdown(f"**{msg['speaker']}**")
 
-        # 🎬 포스터 표시 (assistant + movie_title 있을 때)
-        movie_title = msg.get("movie_title")
-        if role == "assistant" and movie_title:
-            if movie_title not in st.session_state.shown_posters:
-                poster_url = get_poster_url(movie_title)
-                if poster_url:
-                    st.image(poster_url, width=220)
-                    st.session_state.shown_posters.add(movie_title)
+        if role == "assistant":
+            render_poster(msg.get("movie_title"))
 
         st.markdown(msg["text"])
 
 
+# -------------------------
+# 스트리밍 렌더링 (봇 발화가 도착하는 대로 토큰 단위 출력)
+# -------------------------
+def _deltas(events: Iterator[Dict]) -> Iterator[str]:
+    # end 이벤트까지 delta만 흘려보내고, 완성 메시지는 저장
+    for ev in events:
+        if ev["type"] == "delta":
+            yield ev["text"]
+        elif ev["type"] == "end":
+            session.add_message(ev["message"])
+            return
+
+
+def render_stream(events: Iterator[Dict]):
+    for ev in events:
+        if ev["type"] == "start":
+            with st.chat_message("assistant"):
+                st.markdown(f"**{ev['speaker']}**")
+                render_poster(ev.get("movie_title"))
+                st.write_stream(_deltas(events))
+
+
 # -------------------------
 # 기존 메시지 출력
 # -------------------------
-for m in st.session_state.messages:
+if session.archived:
+    st.caption(f"이전 메시지 {session.archived}개는 보관됨")
+
+for m in session.messages:
     render_message(m)
 
 
@@ -95,10 +131,8 @@ with st.sidebar:
     st.divider()
 
     if st.button("🧹 대화 초기화"):
-        st.session_state.messages = []
-        st.session_state.context = {}
-        st.session_state.shown_posters = set()
-        st.session_state.initialized = False
+        store.delete(session.id)
+        del st.session_state["session_id"]
         st.rerun()
 
 
@@ -109,25 +143,27 @@ user_input = st.chat_input("예: 크리스마스에 연인이랑 볼 영화 추
 
 if user_input:
     # 사용자 메시지 저장
-    st.session_state.messages.append({
+    user_message = {
         "role": "user",
         "speaker": "🙋 나",
         "text": user_input
-    })
+    }
+    session.add_message(user_message)
 
-    render_message(st.session_state.messages[-1])
+    render_message(user_message)
 
-    # 로딩 표시
-    with st.spinner("🎬 큐레이터들이 열심히 떠드는 중..."):
-        responses, updated_context = run_turn(
+    # 턴이 도는 동안은 세션이 메모리에서 내려가지 않도록
+    with session.lock:
+        events = run_turn_stream(
             user_input=user_input,
-            context=st.session_state.context,
-            targets=targets
+            context=session.context,
+            targets=targets,
+            container=load_container()
         )
 
-    # 응답 메시지 추가
-    for r in responses:
-        st.session_state.messages.append(r)
-        render_message(r)
+        # 첫 발화가 시작될 때까지만 로딩 표시
+        with st.spinner("🎬 큐레이터들이 열심히 떠드는 중..."):
+            first = next(events)
 
-    st.session_state.context = updated_context
+        # 응답을 도착하는 대로 출력
+        render_stream(itertools.chain([first], events))
@@ -0,0 +1,207 @@
+import json
+import math
+import random
+import re
+import threading
+import time
+import zlib
+from collections import Counter
+from types import SimpleNamespace as NS
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+from requests.adapters import BaseAdapter
+
+# -----------------------------
+# 지연 분포 (로그정규: 중앙값 + p95로 지정)
+# -----------------------------
+class Latency:
+    def __init__(self, median_ms: float, p95_ms: Optional[float] = None, seed: Optional[int] = None):
+        self.median = median_ms / 1000
+        p95 = (p95_ms or median_ms) / 1000
+        self.sigma = math.log(p95 / self.median) / 1.645 if p95 > self.median else 0.0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def parse(cls, spec: str, seed: Optional[int] = None) -> "Latency":
+        # "800" 또는 "800,2000" (ms)
+        parts = [float(x) for x in spec.split(",")]
+        return cls(parts[0], parts[1] if len(parts) > 1 else None, seed=seed)
+
+    def sample(self) -> float:
+        with self._lock:
+            return self.median * math.exp(self._rng.gauss(0, self.sigma)) if self.sigma else self.median
+
+
+# 가짜 데이터에 쓰는 영화 제목 풀
+TITLES = [
+    "기생충", "살인의 추억", "올드보이", "헤어질 결심", "캐롤", "리틀 포레스트", "러브 액츄얼리",
+    "나 홀로 집에", "이터널 선샤인", "비포 선라이즈", "라라랜드", "어바웃 타임", "괴물", "마더",
+    "버닝", "아가씨", "박쥐", "설국열차", "옥자", "밀정", "변호인", "택시운전사", "범죄도시",
+]
+
+
+# -----------------------------
+# KOBIS / TMDB 가짜 전송 계층 (utils.http 세션에 mount)
+# -----------------------------
+class FakeAdapter(BaseAdapter):
+    def __init__(self, latency: Latency):
+        super().__init__()
+        self.latency = latency
+        self.counts: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        url = urlsplit(request.url)
+        params = dict(parse_qsl(url.query))
+        path = url.path.rsplit("/rest/", 1)[-1] if "/rest/" in url.path else url.path
+        with self._lock:
+            self.counts[f"{url.netloc}{url.path}"] += 1
+
+        time.sleep(self.latency.sample())
+        body = self.respond(url.netloc, path, params)
+
+        resp = requests.Response()
+        resp.status_code = 200
+        resp._content = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        resp.headers["Content-Type"] = "application/json"
+        resp.encoding = "utf-8"
+        resp.url = request.url
+        resp.request = request
+        return resp
+
+    def close(self):
+        pass
+
+    def respond(self, host: str, path: str, p: Dict[str, str]) -> Dict:
+        if "themoviedb" in host:
+            return {"results": [{"poster_path": f"/{_code(p.get('query', ''))}.jpg"}]}
+
+        if path.endswith("searchMovieList.json"):
+            if p.get("directorNm"):
+                items = [_movie(f"{p['directorNm']} 영화 {i}", p["directorNm"]) for i in range(10)]
+            else:
+                items = [_movie(p.get("movieNm", ""))] if p.get("movieNm") else []
+            return {"movieListResult": {"totCnt": len(items), "movieList": items}}
+
+        if path.endswith("searchMovieInfo.json"):
+            return {"movieInfoResult": {"movieInfo": {"movieCd": p.get("movieCd"), "movieNm": "영화"}}}
+
+        if path.endswith("searchPeopleList.json"):
+            name = p.get("peopleNm", "")
+            return {"peopleListResult": {"peopleList": [
+                {"peopleCd": f"P{_code(name)}", "peopleNm": name, "repRoleNm": "배우", "filmoNames": "|".join(TITLES[:5])}
+            ]}}
+
+        if path.endswith("searchPeopleInfo.json"):
+            return {"peopleInfoResult": {"peopleInfo": {"peopleCd": p.get("peopleCd"), "filmos": [
+                {"movieCd": str(i), "movieNm": t, "moviePartNm": "배우"} for i, t in enumerate(TITLES[5:15])
+            ]}}}
+
+        if "BoxOffice" in path:
+            key = "dailyBoxOfficeList" if "Daily" in path else "weeklyBoxOfficeList"
+            return {"boxOfficeResult": {key: [{"rank": str(i + 1), "movieNm": t} for i, t in enumerate(TITLES[-10:])]}}
+
+        return {"faultInfo": {"message": "unknown path"}}
+
+
+def _code(text: str) -> str:
+    return str(zlib.crc32(text.encode("utf-8")) % 100000)
+
+
+def _movie(name: str, director: str = "봉준호") -> Dict:
+    return {
+        "movieCd": _code(name), "movieNm": name, "openDt": "20190530",
+        "genreAlt": "드라마", "nationAlt": "한국", "directors": [{"peopleNm": director}],
+    }
+
+
+# -----------------------------
+# OpenAI chat.completions 가짜 (utils.llm._client 교체)
+# 프롬프트 캐시 흉내: 메시지 경계까지의 접두가 전에 본 것과 같고 min_tokens 이상이면
+# 128토큰 단위로 cached_tokens를 돌려주고, 그만큼 prefill 시간을 줄임
+# -----------------------------
+PREFILL_SHARE = 0.3  # 전체 지연 중 프롬프트 처리 비중 (캐시되면 이 부분이 줄어듦)
+
+
+class FakeOpenAI:
+    def __init__(self, latency: Latency, seed: int = 0, prefix_cache: bool = True, min_tokens: int = 1024):
+        self.latency = latency
+        self.calls = 0
+        self.prompt_chars = 0
+        self.usage = Counter()
+        self.prefix_cache = prefix_cache
+        self.min_tokens = min_tokens
+        self._prefixes: set = set()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.chat = NS(completions=NS(create=self.create))
+
+    def _cached_tokens(self, messages: List[Dict]) -> int:
+        from utils.prompt import count_tokens
+
+        cached = 0
+        tokens = 0
+        acc = ""
+        keys = []
+        for m in messages[:-1]:
+            acc += m["role"] + "\x00" + m["content"] + "\x00"
+            tokens += count_tokens(m["content"])
+            keys.append((zlib.crc32(acc.encode("utf-8")), tokens))
+        with self._lock:
+            for key, n in keys:
+                if key in self._prefixes and n >= self.min_tokens:
+                    cached = n // 128 * 128
+                self._prefixes.add(key)
+        return cached if self.prefix_cache else 0
+
+    def create(self, model: str, messages: List[Dict], temperature: float = 0.9, stream: bool = False, **kwargs):
+        from utils.prompt import count_tokens
+
+        prompt = "".join(m["content"] for m in messages)
+        with self._lock:
+            self.calls += 1
+            self.prompt_chars += len(prompt)
+            picks = self._rng.sample(TITLES, 2)
+
+        if kwargs.get("response_format", {}).get("type") == "json_object" and '"answers"' in prompt:
+            # 묶음 생성: 요청 id마다 답 하나
+            ids = re.findall(r"^\[요청 (\S+)\]", messages[-1]["content"], flags=re.M)
+            text = json.dumps({"answers": [{"id": i, "text": "벤치마크용 추천 멘트입니다. " * 20} for i in ids]}, ensure_ascii=False)
+        elif kwargs.get("response_format", {}).get("type") == "json_object":
+            # one-shot: 제목 + 발화
+            text = json.dumps({"title": picks[0], "message": "벤치마크용 추천 멘트입니다. " * 20}, ensure_ascii=False)
+        elif "JSON" in prompt:
+            text = json.dumps([{"title": t, "why": "벤치마크"} for t in picks], ensure_ascii=False)
+        else:
+            text = "벤치마크용 추천 멘트입니다. " * 20
+
+        prompt_tokens = sum(count_tokens(m["content"]) for m in messages)
+        cached = self._cached_tokens(messages)
+        completion_tokens = count_tokens(text)
+        usage = NS(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=prompt_tokens + completion_tokens,
+            prompt_tokens_details=NS(cached_tokens=cached),
+        )
+        with self._lock:
+            self.usage.update(prompt_tokens=prompt_tokens, cached_tokens=cached, completion_tokens=completion_tokens)
+
+        total = self.latency.sample() * (1 - PREFILL_SHARE * cached / max(prompt_tokens, 1))
+        if stream:
+            return self._stream(text, total, usage)
+
+        time.sleep(total)
+        return NS(choices=[NS(message=NS(content=text))], usage=usage)
+
+    def _stream(self, text: str, total: float, usage) -> Iterator:
+        # 첫 토큰까지 전체의 30%, 나머지는 조각마다 나눠서
+        time.sleep(total * 0.3)
+        pieces = [text[i:i + 16] for i in range(0, len(text), 16)]
+        for piece in pieces:
+            time.sleep(total * 0.7 / len(pieces))
+            yield NS(choices=[NS(delta=NS(content=piece))], usage=None)
+        yield NS(choices=[], usage=usage)
@@ -0,0 +1,119 @@
+import argparse
+import re
+import time
+from typing import Callable, Dict, List, Tuple
+
+from utils.intent import IntentClassifier, default_classifier
+
+# -----------------------------
+# 기존 두 스캐너 (비교 기준)
+# -----------------------------
+def legacy_classify_intent(text: str) -> Dict:
+    t = text.strip()
+    if "감독" in t:
+        m = re.search(r"(.+?)\s*감독", t)
+        return {"type": "recommend", "criteria": "director", "value": m.group(1).strip() if m else ""}
+    if "배우" in t or "출연" in t:
+        m = re.search(r"(.+?)\s*(배우|출연)", t)
+        return {"type": "recommend", "criteria": "actor", "value": m.group(1).strip() if m else ""}
+    if any(k in t for k in ["박스오피스", "흥행", "유명", "명작", "시대", "년대"]):
+        return {"type": "recommend", "criteria": "boxoffice", "value": None}
+    return {"type": "curation", "criteria": None, "value": None}
+
+
+def legacy_parse_intent_and_constraints(text: str) -> Tuple[str, Dict]:
+    t = (text or "").strip()
+    curation_keywords = ["소개", "분석", "해석", "설명", "어때", "볼까", "볼지", "큐레이션", "리뷰", "평"]
+    recommend_keywords = ["추천", "비슷한", "같은", "골라", "뭐 볼", "뭐볼", "추천해", "추천좀"]
+    intent = "RECOMMEND"
+    if any(k in t for k in curation_keywords) and not any(k in t for k in recommend_keywords):
+        intent = "CURATE"
+    if any(k in t for k in recommend_keywords):
+        intent = "RECOMMEND"
+    constraints: Dict = {}
+    if "크리스마스" in t:
+        constraints["mood"] = "christmas"
+    if "로맨스" in t or "멜로" in t:
+        constraints["genre"] = "romance"
+    if "공포" in t or "호러" in t:
+        constraints["genre"] = "horror"
+    return intent, constraints
+
+
+def legacy_both(text: str) -> Dict:
+    out = legacy_classify_intent(text)
+    out["mode"], out["constraints"] = legacy_parse_intent_and_constraints(text)
+    return out
+
+
+INPUTS = [
+    "봉준호 감독 영화 추천해줘",
+    "송강호 배우 나오는 영화 추천해줘",
+    "전도연 출연작 중에 뭐 볼까",
+    "요즘 흥행한 영화 뭐 있어?",
+    "90년대 명작 골라줘",
+    "크리스마스에 연인이랑 볼 로맨스 영화 추천해줘",
+    "비 오는 날 혼자 보기 좋은 공포 영화",
+    "기생충 결말 해석 좀 해줘",
+    "이 영화 어때? 볼지 말지 고민돼",
+    "잔잔하고 따뜻한 멜로 추천좀",
+]
+
+
+def check(engine: IntentClassifier) -> List[str]:
+    # 기존 결과와 다른 입력
+    return [t for t in INPUTS if engine.classify(t) != legacy_both(t)]
+
+
+def timeit(fn: Callable[[str], object], texts: List[str], rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for t in texts:
+            fn(t)
+    return (time.perf_counter() - start) / (rounds * len(texts)) * 1e6
+
+
+def widened(extra: int) -> Tuple[Callable[[str], object], IntentClassifier]:
+    # 키워드 수가 늘 때 호출당 비용 (가짜 키워드 extra개 추가)
+    import json
+    from utils.intent import RULES_PATH
+
+    with open(RULES_PATH, encoding="utf-8") as f:
+        rules = json.load(f)
+    keywords = [f"키워드{i:04d}" for i in range(extra)]
+    rules["constraints"]["tag"] = {f"t{i}": [k] for i, k in enumerate(keywords)}
+
+    def legacy(text: str) -> Dict:
+        # 기존 방식이면 키워드마다 in 검사 하나씩 더
+        out = legacy_both(text)
+        tags = [k for k in keywords if k in text]
+        if tags:
+            out["constraints"]["tag"] = tags[-1]
+        return out
+
+    return legacy, IntentClassifier(rules)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="의도 분류기 마이크로벤치마크 (기존 스캐너 vs 컴파일 규칙)")
+    parser.add_argument("--rounds", type=int, default=20000)
+    args = parser.parse_args()
+
+    engine = default_classifier()
+    diff = check(engine)
+    print(f"기존 결과와 다른 입력: {len(diff)} {diff if diff else ''}")
+
+    legacy = timeit(legacy_both, INPUTS, args.rounds)
+    compiled = timeit(engine.classify, INPUTS, args.rounds)
+    print(f"legacy   {legacy:7.2f} µs/call")
+    print(f"compiled {compiled:7.2f} µs/call ({legacy / compiled:.1f}x)")
+    for extra in (100, 1000):
+        legacy_fn, wide = widened(extra)
+        rounds = max(args.rounds // 10, 1)
+        before = timeit(legacy_fn, INPUTS, rounds)
+        after = timeit(wide.classify, INPUTS, rounds)
+        print(f"+{extra:<4} keywords  legacy {before:7.2f} µs/call  compiled {after:7.2f} µs/call ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# 실제 키 없이 돌도록 가짜 키를 먼저 넣고 (모듈 로드 시점에 읽힘)
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+os.environ.setdefault("KOBIS_API_KEY", "bench")
+os.environ.setdefault("TMDB_API_KEY", "bench")
+# KOBIS 한도는 기본으로 끔 (측정이 로컬 일일 카운터에 쌓이지 않게 - 켜려면 --kobis-quota)
+os.environ.setdefault("KOBIS_DAILY_QUOTA", "0")
+os.environ.setdefault("KOBIS_RATE", "0")
+
+from bench.fakes import FakeAdapter, FakeOpenAI, Latency  # noqa: E402
+
+# -----------------------------
+# 시나리오 (의도별 대표 입력)
+# -----------------------------
+SCENARIOS = {
+    "director": "봉준호 감독 영화 추천해줘",
+    "actor": "송강호 배우 나오는 영화 추천해줘",
+    "boxoffice": "요즘 흥행한 영화 뭐 있어?",
+    "curation": "크리스마스에 연인이랑 볼 영화 추천해줘",
+}
+
+TARGET_SETS = {
+    "all": ["모두"],
+    "single": ["영화덕후"],
+    "pair": ["영화전문가", "대중관객"],
+}
+
+
+# 100만 토큰당 USD (입력, 캐시된 입력, 출력) - gpt-4o-mini 기준
+PRICES = "0.15,0.075,0.60"
+
+
+class Bench:
+    def __init__(
+        self,
+        llm_latency: Latency,
+        kobis_latency: Latency,
+        tmdb_latency: Latency,
+        prefix_cache: bool = True,
+        prefix_min_tokens: int = 1024,
+    ):
+        from utils import http
+        import utils.llm
+
+        self.kobis = FakeAdapter(kobis_latency)
+        self.tmdb = FakeAdapter(tmdb_latency)
+        # 재시도 없는 세션(KOBIS는 시도마다 한도를 세며 직접 재시도)에도 같이
+        for session in (http.get_session(), http.get_session(retries=False)):
+            session.mount("https://www.kobis.or.kr", self.kobis)
+            session.mount("https://api.themoviedb.org", self.tmdb)
+
+        self.openai = FakeOpenAI(llm_latency, prefix_cache=prefix_cache, min_tokens=prefix_min_tokens)
+        utils.llm._client = self.openai
+
+    def counts(self) -> Dict[str, int]:
+        return {
+            "openai": self.openai.calls,
+            "kobis": sum(self.kobis.counts.values()),
+            "tmdb": sum(self.tmdb.counts.values()),
+        }
+
+    def tokens(self) -> Dict[str, int]:
+        return dict(self.openai.usage)
+
+
+def token_cost(before: Dict[str, int], after: Dict[str, int], turns: int, prices: str) -> Dict[str, float]:
+    # 턴당 토큰 + 비용 (캐시된 입력은 할인 단가)
+    p_in, p_cached, p_out = (float(x) for x in prices.split(","))
+    d = {k: (after.get(k, 0) - before.get(k, 0)) / max(turns, 1) for k in ("prompt_tokens", "cached_tokens", "completion_tokens")}
+    cost = ((d["prompt_tokens"] - d["cached_tokens"]) * p_in + d["cached_tokens"] * p_cached + d["completion_tokens"] * p_out) / 1e6
+    return {**{k: round(v, 1) for k, v in d.items()}, "cost_usd": round(cost, 7)}
+
+
+def reset_caches() -> None:
+    # 콜드 측정: 프로세스 공유 캐시 비우기
+    import utils.kobis
+    import utils.llm
+    import utils.titles
+    import utils.tmdb
+    from container import get_container
+
+    utils.kobis.default_cache().clear()
+    utils.llm.get_cache().clear()
+    utils.titles.default_matcher().cache.clear()
+    utils.tmdb._cache.clear()
+    get_container().people.clear()
+
+
+def percentile(values: List[float], p: float) -> float:
+    if not values:
+        return 0.0
+    s = sorted(values)
+    k = (len(s) - 1) * p / 100
+    lo, hi = int(k), min(int(k) + 1, len(s) - 1)
+    return s[lo] + (s[hi] - s[lo]) * (k - lo)
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    ms = [x * 1000 for x in latencies]
+    return {
+        "turns": len(ms),
+        "mean_ms": round(statistics.fmean(ms), 1) if ms else 0.0,
+        "p50_ms": round(percentile(ms, 50), 1),
+        "p95_ms": round(percentile(ms, 95), 1),
+        "p99_ms": round(percentile(ms, 99), 1),
+    }
+
+
+def one_turn(
+    text: str,
+    targets: List[str],
+    context: Dict,
+    stream: bool,
+    concurrent: bool,
+    one_shot: bool = False,
+    batch: str = "off",
+) -> Dict[str, float]:
+    from main import run_turn, run_turn_stream
+
+    kwargs = dict(user_input=text, context=context, targets=targets, concurrent=concurrent, one_shot=one_shot, batch=batch)
+    start = time.perf_counter()
+    if not stream:
+        run_turn(**kwargs)
+        return {"latency": time.perf_counter() - start}
+
+    first: Optional[float] = None
+    for ev in run_turn_stream(**kwargs):
+        if first is None and ev["type"] == "delta":
+            first = time.perf_counter() - start
+    return {"latency": time.perf_counter() - start, "ttft": first or 0.0}
+
+
+# -----------------------------
+# 실행
+# -----------------------------
+def run_scenarios(bench: Bench, args) -> Dict[str, Dict]:
+    out: Dict[str, Dict] = {}
+    for intent, text in SCENARIOS.items():
+        for tname, targets in TARGET_SETS.items():
+            lat, ttft = [], []
+            before, tokens_before = bench.counts(), bench.tokens()
+            for _ in range(args.turns):
+                if args.cold:
+                    reset_caches()
+                r = one_turn(text, targets, {}, args.stream, not args.sequential, args.one_shot, args.batch)
+                lat.append(r["latency"])
+                if "ttft" in r:
+                    ttft.append(r["ttft"])
+            after = bench.counts()
+
+            row = summarize(lat)
+            row["requests_per_turn"] = {k: round((after[k] - before[k]) / args.turns, 2) for k in after}
+            row["llm_per_turn"] = token_cost(tokens_before, bench.tokens(), args.turns, args.prices)
+            if ttft:
+                row["ttft_p50_ms"] = round(percentile([x * 1000 for x in ttft], 50), 1)
+                row["ttft_p95_ms"] = round(percentile([x * 1000 for x in ttft], 95), 1)
+            out[f"{intent}/{tname}"] = row
+            llm = row["llm_per_turn"]
+            print(
+                f"{intent:>10}/{tname:<6} p50={row['p50_ms']:>8}ms p95={row['p95_ms']:>8}ms req/turn={row['requests_per_turn']}"
+                f" tokens={llm['prompt_tokens']:.0f}(cached {llm['cached_tokens']:.0f}) ${llm['cost_usd']:.6f}"
+            )
+    return out
+
+
+def run_throughput(bench: Bench, args) -> Dict:
+    # N개 세션이 동시에 대화 (세션마다 context 유지, 의도는 돌아가며)
+    texts = list(SCENARIOS.values())
+    lat: List[float] = []
+
+    def session(i: int) -> None:
+        context: Dict = {}
+        for j in range(args.turns):
+            r = one_turn(texts[(i + j) % len(texts)], ["모두"], context, args.stream, not args.sequential, args.one_shot, args.batch)
+            lat.append(r["latency"])
+
+    if args.cold:
+        reset_caches()
+    before, tokens_before = bench.counts(), bench.tokens()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.sessions) as ex:
+        list(ex.map(session, range(args.sessions)))
+    elapsed = time.perf_counter() - start
+    after = bench.counts()
+
+    row = summarize(lat)
+    row.update({
+        "sessions": args.sessions,
+        "elapsed_s": round(elapsed, 2),
+        "turns_per_sec": round(len(lat) / elapsed, 2) if elapsed else 0.0,
+        "requests_per_turn": {k: round((after[k] - before[k]) / max(len(lat), 1), 2) for k in after},
+        "llm_per_turn": token_cost(tokens_before, bench.tokens(), len(lat), args.prices),
+    })
+    if args.batch == "queue":
+        from utils.batch import default_batcher
+
+        row["batcher"] = default_batcher().stats()
+    print(f"throughput sessions={args.sessions} turns/s={row['turns_per_sec']} p95={row['p95_ms']}ms {row.get('batcher', '')}")
+    return row
+
+
+def compare(current: Dict, baseline_path: str) -> None:
+    with open(baseline_path, encoding="utf-8") as f:
+        base = json.load(f)
+    print(f"\n--- vs {baseline_path}")
+    for name, row in current["scenarios"].items():
+        old = base.get("scenarios", {}).get(name)
+        if not old:
+            continue
+        for key in ("p50_ms", "p95_ms"):
+            if old.get(key):
+                delta = (row[key] - old[key]) / old[key] * 100
+                print(f"{name:>18} {key}: {old[key]:>8} → {row[key]:>8} ({delta:+.1f}%)")
+        old_cost = old.get("llm_per_turn", {}).get("cost_usd")
+        if old_cost:
+            cost = row["llm_per_turn"]["cost_usd"]
+            print(f"{name:>18} cost/turn: {old_cost:.6f} → {cost:.6f} ({(cost - old_cost) / old_cost * 100:+.1f}%)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="run_turn 지연/처리량 벤치마크 (OpenAI/KOBIS/TMDB 가짜 전송)")
+    parser.add_argument("--turns", type=int, default=10, help="시나리오당 턴 수")
+    parser.add_argument("--sessions", type=int, default=8, help="동시 세션 수 (처리량 측정)")
+    parser.add_argument("--llm-ms", default="800,2000", help="OpenAI 지연 중앙값,p95 (ms)")
+    parser.add_argument("--kobis-ms", default="80,300", help="KOBIS 지연 중앙값,p95 (ms)")
+    parser.add_argument("--tmdb-ms", default="100,300", help="TMDB 지연 중앙값,p95 (ms)")
+    parser.add_argument("--cold", action="store_true", help="턴마다 캐시 비우기")
+    parser.add_argument("--stream", action="store_true", help="run_turn_stream으로 측정 (첫 토큰 시간 포함)")
+    parser.add_argument("--sequential", action="store_true", help="봇 병렬 실행 끄기")
+    parser.add_argument("--one-shot", action="store_true", help="큐레이션을 봇당 한 번의 호출로 (고르기+발화)")
+    parser.add_argument("--kobis-quota", type=int, default=0, help="KOBIS 일일 한도 (새 카운터로 시작, 0이면 끔)")
+    parser.add_argument("--kobis-rate", type=float, default=0, help="KOBIS 초당 호출 (0이면 끔)")
+    parser.add_argument("--pools", action="store_true", help="미리 만든 추천 풀 사용 (측정 전에 빌드)")
+    parser.add_argument("--batch", choices=["off", "combined", "queue"], default="off", help="봇 발화 묶음 생성")
+    parser.add_argument("--no-prefix-cache", action="store_true", help="OpenAI 프롬프트 캐시 흉내 끄기 (비교용)")
+    parser.add_argument("--prefix-min-tokens", type=int, default=1024, help="프롬프트 캐시가 적용되는 최소 접두 토큰")
+    parser.add_argument("--prices", default=PRICES, help="100만 토큰당 USD: 입력,캐시된 입력,출력")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="bench_result.json")
+    parser.add_argument("--compare", help="이전 결과 JSON과 비교")
+    args = parser.parse_args()
+
+    bench = Bench(
+        Latency.parse(args.llm_ms, seed=args.seed),
+        Latency.parse(args.kobis_ms, seed=args.seed + 1),
+        Latency.parse(args.tmdb_ms, seed=args.seed + 2),
+        prefix_cache=not args.no_prefix_cache,
+        prefix_min_tokens=args.prefix_min_tokens,
+    )
+
+    # 추천 풀: 켜면 가짜 LLM으로 미리 빌드, 아니면 빈 풀 (로컬에 있던 풀 파일이 측정에 섞이지 않게)
+    from container import get_container
+    from utils.pools import RecommendationPools, build_pools
+
+    pools = RecommendationPools(os.path.join(tempfile.mkdtemp(), "pools.json"))
+    if args.pools:
+        container = get_container()
+        pools.save(*build_pools(list(container.bots.values())))
+        print(f"pools {pools.stats()}")
+    get_container().pools = pools
+
+    if args.kobis_quota or args.kobis_rate:
+        from utils.quota import DailyQuota, KobisLimiter, TokenBucket
+
+        quota = DailyQuota(args.kobis_quota, os.path.join(tempfile.mkdtemp(), "quota.sqlite"))
+        get_container().kobis.limiter = KobisLimiter(TokenBucket(args.kobis_rate, max(int(args.kobis_rate * 2), 1)), quota)
+
+    result = {
+        "meta": {
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "args": vars(args),
+        },
+        "scenarios": run_scenarios(bench, args),
+        "throughput": run_throughput(bench, args),
+    }
+
+    if args.kobis_quota or args.kobis_rate:
+        result["kobis_quota"] = get_container().kobis.limiter.stats()
+        print(f"kobis quota {result['kobis_quota']}")
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"→ {args.out}")
+
+    if args.compare:
+        compare(result, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import threading
+from typing import Dict, List, Optional
+
+from utils import http
+from utils.boxoffice import BoxofficeService
+from utils.kobis import AsyncKobisClient, KobisClient
+from utils.people import PeopleResolver
+from utils.pools import RecommendationPools, default_pools
+from utils.similar import SimilarIndex, default_index
+from curators.base import CuratorBot
+from curators.cinephile import CinephileBot
+from curators.critic import CriticBot
+from curators.popular import PopularBot
+
+
+# -----------------------------
+# 프로세스 단위 컨테이너
+# 클라이언트/봇/HTTP 풀을 한 번만 만들고 모든 세션이 공유 (봇은 상태가 없어 스레드 안전)
+# -----------------------------
+class AppContainer:
+    def __init__(self, kobis: Optional[KobisClient] = None):
+        self.session = http.get_session()
+        self.kobis = kobis or KobisClient()
+        self.async_kobis = AsyncKobisClient(self.kobis)
+
+        # 박스오피스는 하루 한 번 백그라운드로 받아두고 메모리에서 씀
+        self.boxoffice = BoxofficeService(self.kobis)
+        self.boxoffice.start()
+
+        # 배우/감독 이름 → 필모 (한 번 해석하면 재사용)
+        self.people = PeopleResolver(self.kobis, self.boxoffice)
+
+        # 분위기/장르별로 미리 만들어 둔 추천 풀 (오프라인 잡: python -m utils.pools)
+        self.pools: RecommendationPools = default_pools()
+
+        # "비슷한 영화" 후보용 로컬 벡터 인덱스 (SIMILAR_INDEX_PATH 있을 때만)
+        self.similar: Optional[SimilarIndex] = default_index()
+
+        self.bots: Dict[str, CuratorBot] = {
+            "영화덕후": CinephileBot(self.kobis, self.people),
+            "영화전문가": CriticBot(self.kobis),
+            "대중관객": PopularBot(self.kobis, self.boxoffice),
+        }
+
+    def select_bots(self, targets: List[str]) -> List[CuratorBot]:
+        if "모두" in targets:
+            return list(self.bots.values())
+        return [self.bots[t] for t in targets if t in self.bots]
+
+
+_container: Optional[AppContainer] = None
+_lock = threading.Lock()
+
+
+def get_container() -> AppContainer:
+    global _container
+    if _container is None:
+        with _lock:
+            if _container is None:
+                _container = AppContainer()
+    return _container
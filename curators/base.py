@@ -1,7 +1,12 @@
+import hashlib
 import json
-from typing import Any, Dict, List, Tuple
+import os
+import re
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+from curators.prompts import COMMON_OUTPUT_RULES, CONVERSATION_RULES, ONE_SHOT_FORMAT, REPAIR_REQUEST
 from utils.kobis import KobisClient
-from utils.llm import ask_llm
+from utils.llm import ask_llm, ask_llm_stream, normalize_text
+from utils.prompt import budget_text, budget_titles, build_prompt, compact_facts, compact_ideas
 
 def safe_json_loads(text: str) -> Any:
     try:
@@ -9,6 +14,12 @@ def safe_json_loads(text: str) -> Any:
     except Exception:
         return None
 
+# 스트리밍 중인 JSON에서 "title":"..." 이 닫히는 순간 잡기
+_TITLE_FIELD = re.compile(r'"title"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+# think 프롬프트의 "이미 고른 영화" 줄 예산 (풀 빌드는 라운드마다 쌓이니 넉넉히)
+FORBIDDEN_TOKENS = int(os.getenv("PROMPT_FORBIDDEN_TOKENS", "400"))
+
 class CuratorBot:
     label: str
     system: str
@@ -18,15 +29,101 @@ class CuratorBot:
         self.system = system
         self.kobis = kobis
 
-    def llm(self, user: str, temperature: float = 0.9) -> str:
-        return ask_llm(self.system, user, temperature=temperature)
+    # static: 작업별 고정 규칙 (페르소나 뒤에 붙는 고정 접두 - 프롬프트 캐시 대상)
+    def llm(
+        self,
+        user: str,
+        temperature: float = 0.9,
+        cache_key: Optional[str] = None,
+        static: str = "",
+        json_mode: bool = False,
+    ) -> str:
+        return ask_llm(self.system, user, temperature=temperature, cache_key=cache_key, static=static, json_mode=json_mode)
+
+    def llm_stream(self, user: str, temperature: float = 0.9, static: str = "") -> Iterator[str]:
+        return ask_llm_stream(self.system, user, temperature=temperature, static=static)
 
-    def think_recommend(self, user_input: str, constraints: Dict) -> List[Dict]:
+    def think_recommend(
+        self,
+        user_input: str,
+        constraints: Dict,
+        on_title: Optional[Callable[[str], None]] = None,
+    ) -> List[Dict]:
         raise NotImplementedError
 
+    def think_llm(
+        self,
+        user: str,
+        temperature: float,
+        cache_key: str,
+        static: str,
+        on_title: Optional[Callable[[str], None]] = None,
+    ) -> str:
+        # on_title이 있으면 스트리밍으로 받으면서 제목이 나오는 대로 알려줌 (검증/포스터를 먼저 시작)
+        if on_title is None:
+            return self.llm(user, temperature=temperature, cache_key=cache_key, static=static)
+        buf = ""
+        pos = 0
+        for d in ask_llm_stream(self.system, user, temperature=temperature, cache_key=cache_key, static=static):
+            buf += d
+            for m in _TITLE_FIELD.finditer(buf, pos):
+                pos = m.end()
+                title = safe_json_loads(f'"{m.group(1)}"')
+                if isinstance(title, str) and title.strip():
+                    on_title(title.strip())
+        return buf.strip()
+
+    def hints(self, user_input: str) -> str:
+        # 봇별 참고 자료 (필모/트렌드 등) - 유저 메시지에 한 줄로
+        return ""
+
+    def similar_hint(self, constraints: Dict) -> str:
+        # 유사 영화 인덱스가 찾은 후보 (카탈로그로 확인된 제목) + 이미 고른/나온 제목 - 있으면 think 프롬프트에 한 줄씩
+        titles = constraints.get("similar_titles") or []
+        forbidden = constraints.get("forbidden_titles") or []
+        hint = f"\n비슷한 후보(카탈로그): {titles}" if titles else ""
+        if forbidden:
+            hint += f"\n이미 고른 영화(다시 고르지 말 것): {budget_titles(forbidden, FORBIDDEN_TOKENS)}"
+        return hint
+
+    def think_cache_key(self, user_input: str, constraints: Dict, prompt: str = "") -> str:
+        # 후보 JSON 단계는 요청 문장을 정규화해서 캐시 (표현만 다른 같은 요청 공유)
+        # 프롬프트의 나머지(트렌드 후보/필모/유사 후보 등)는 해시로 - 힌트가 바뀌면 새로 생각
+        forbidden = sorted(constraints.get("forbidden_titles") or [])
+        rest = hashlib.sha256(prompt.replace(user_input, "").encode("utf-8")).hexdigest()[:16]
+        return f"think:{self.label}:{normalize_text(user_input)}:{'|'.join(forbidden)}:{rest}"
+
     def verify_movies(self, titles: List[str]) -> Dict[str, Any]:
         return self.kobis.verify_titles(titles)
 
+    def recommend_prompt(
+        self,
+        user_input: str,
+        ideas: List[Dict],
+        facts: Dict[str, Any],
+        constraints: Dict,
+        previous_messages: str,
+        used_titles: List[str],
+        common_rules: str = COMMON_OUTPUT_RULES,
+        conversation_rules: str = CONVERSATION_RULES,
+        next_turn: str = "",
+    ) -> Tuple[str, str, List[str]]:
+        # (고정 접두, 유저 메시지, 고른 제목) - 묶음 생성에서도 같은 프롬프트를 씀
+        picked = [x.get("title") for x in ideas if x.get("title")][:2]
+
+        # 규칙은 고정 접두로, 유저 메시지에는 매번 바뀌는 것만
+        # 세그먼트마다 필요한 필드만, 길어지는 목록/발화는 토큰 예산 안에서
+        static = f"{common_rules}\n{conversation_rules}".strip()
+        prompt, _ = build_prompt([
+            ("user_input", "사용자 질문", user_input),
+            ("previous_messages", "앞서 말한 다른 큐레이터 발화", budget_text(previous_messages)),
+            ("used_titles", "이미 언급된 영화 목록", budget_titles(used_titles)),
+            ("ideas", "너의 1차 후보(참고)", compact_ideas(ideas)),
+            ("facts", "API로 확인한 메타데이터(있으면 근거로 1~2문장만 활용)", compact_facts(facts)),
+            ("next_turn", None, next_turn.strip()),
+        ], static=static, bot=self.label)
+        return static, prompt, picked
+
     def respond_recommend(
         self,
         user_input: str,
@@ -38,30 +135,51 @@ class CuratorBot:
         common_rules: str,
         conversation_rules: str,
         next_turn: str,
-    ) -> Tuple[str, List[str]]:
-        # 항상 정의
-        picked = [x.get("title") for x in ideas if x.get("title")][:2]
+        stream: bool = False,
+    ) -> Tuple[Union[str, Iterator[str]], List[str]]:
+        static, prompt, picked = self.recommend_prompt(
+            user_input, ideas, facts, constraints, previous_messages, used_titles,
+            common_rules, conversation_rules, next_turn,
+        )
 
-        prompt = f"""
-{common_rules}
-{conversation_rules}
-
-[사용자 질문]
-{user_input}
+        # stream=True면 완성된 문자열 대신 delta 이터레이터를 돌려줌
+        if stream:
+            return self.llm_stream(prompt, temperature=0.9, static=static), picked # type: ignore
+        text = self.llm(prompt, temperature=0.9, static=static)
+        return text, picked # type: ignore
 
-[앞서 말한 다른 큐레이터 발화]
-{previous_messages}
+    # -----------------------------
+    # one-shot: 후보 고르기 + 발화를 한 번의 호출로 (JSON {"title", "message"})
+    # -----------------------------
+    def one_shot_static(self) -> str:
+        return f"{COMMON_OUTPUT_RULES}\n{CONVERSATION_RULES}".strip() + "\n" + ONE_SHOT_FORMAT
 
-[이미 언급된 영화 목록]
-{used_titles}
+    def one_shot(self, user_input: str, used_titles: List[str]) -> Optional[Dict]:
+        static = self.one_shot_static()
+        prompt, _ = build_prompt([
+            ("user_input", "사용자 질문", user_input),
+            ("hints", "참고", self.hints(user_input)),
+            ("used_titles", "이미 언급된 영화 목록", budget_titles(used_titles)),
+        ], static=static, bot=self.label)
+        return _draft(self.llm(prompt, temperature=0.9, static=static, json_mode=True))
 
-[너의 1차 후보(참고)]
-{ideas}
+    def repair(self, user_input: str, draft: Dict, reason: str, used_titles: List[str]) -> Optional[Dict]:
+        # 같은 고정 접두 + 직전 답변만 붙여서 (접두는 캐시, 새로 쓰는 건 제목 부분 위주)
+        static = self.one_shot_static()
+        prompt, _ = build_prompt([
+            ("user_input", "사용자 질문", user_input),
+            ("used_titles", "이미 언급된 영화 목록", budget_titles(used_titles + [draft["title"]])),
+            ("repair", None, REPAIR_REQUEST.format(message=draft["message"], title=draft["title"], reason=reason)),
+        ], static=static, bot=self.label)
+        return _draft(self.llm(prompt, temperature=0.7, static=static, json_mode=True))
 
-[API로 확인한 메타데이터(있으면 근거로 1~2문장만 활용)]
-{facts}
 
-{next_turn}
-"""
-        text = self.llm(prompt, temperature=0.9)
-        return text, picked # type: ignore
+def _draft(raw: str) -> Optional[Dict]:
+    data = safe_json_loads(raw)
+    if not isinstance(data, dict):
+        return None
+    title = str(data.get("title") or "").strip()
+    message = str(data.get("message") or "").strip()
+    if not title or not message:
+        return None
+    return {"title": title, "message": message}
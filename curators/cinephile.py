@@ -1,41 +1,51 @@
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional
 from curators.base import CuratorBot, safe_json_loads
 from curators.prompts import (
-    CINEPHILE_SYSTEM, COMMON_OUTPUT_RULES, CONVERSATION_RULES, NEXT_TURN_SUGGESTIONS
+    CINEPHILE_SYSTEM, CINEPHILE_THINK, COMMON_OUTPUT_RULES, CONVERSATION_RULES, NEXT_TURN_SUGGESTIONS
 )
 from utils.kobis import KobisClient
+from utils.people import PeopleResolver
+from utils.quota import LOW, priority
 
 class CinephileBot(CuratorBot):
-    def __init__(self, kobis: KobisClient):
+    def __init__(self, kobis: KobisClient, people: Optional[PeopleResolver] = None):
         super().__init__("🎬 영화덕후", CINEPHILE_SYSTEM, kobis)
+        self.people = people
 
-    def think_recommend(self, user_input: str, constraints: Dict) -> List[Dict]:
+    def people_hint(self, user_input: str) -> List[str]:
         # 배우 언급이 있으면 people API로 필모 힌트
-        people_hint = []
         try:
             # 아주 단순: “OOO 영화” 패턴을 잡아 people 검색 힌트로만 사용
             tokens = user_input.replace("배우", " ").replace("출연", " ").split()
-            if tokens:
-                candidate = tokens[0]
-                pdata = self.kobis.search_people_list(peopleNm=candidate, itemPerPage=5)
-                plist = pdata.get("peopleListResult", {}).get("peopleList", []) or []
-                if plist:
-                    people_hint = [p.get("filmoNames") for p in plist[:2] if p.get("filmoNames")]
+            if not tokens:
+                return []
+            candidate = tokens[0]
+            # 힌트용 조회는 KOBIS 한도에서 가장 뒤 순위 (빠듯하면 캐시에 있는 것만)
+            with priority(LOW):
+                if self.people:
+                    # 공유 인물 캐시 (같은 이름은 다시 검색하지 않음)
+                    plist = self.people.candidates(candidate)
+                else:
+                    pdata = self.kobis.search_people_list(peopleNm=candidate, itemPerPage=5)
+                    plist = pdata.get("peopleListResult", {}).get("peopleList", []) or []
+            return [p.get("filmoNames") for p in plist[:2] if p.get("filmoNames")]
         except Exception:
-            people_hint = []
+            return []
 
-        prompt = f"""
-사용자 요청: {user_input}
-덕후 관점에서 추천 영화 1~2편만 고르라.
-가능하면 아래 필모 힌트를 참고해도 된다(없어도 됨): {people_hint}
+    def hints(self, user_input: str) -> str:
+        hint = self.people_hint(user_input)
+        return f"필모 힌트: {hint}" if hint else ""
 
-반드시 JSON 배열로만 출력:
-[
-  {{"title":"영화제목", "why":"덕후스러운 이유(짧게)", "risk":"취향탈 요소(짧게)"}},
-  ...
-]
-"""
-        raw = self.llm(prompt, temperature=0.95)
+    def think_recommend(
+        self,
+        user_input: str,
+        constraints: Dict,
+        on_title: Optional[Callable[[str], None]] = None,
+    ) -> List[Dict]:
+        people_hint = self.people_hint(user_input)
+        prompt = f"""사용자 요청: {user_input}
+필모 힌트: {people_hint}""" + self.similar_hint(constraints)
+        raw = self.think_llm(prompt, 0.95, self.think_cache_key(user_input, constraints, prompt), CINEPHILE_THINK, on_title)
         data = safe_json_loads(raw)
         if isinstance(data, list) and data:
             out = []
@@ -1,7 +1,7 @@
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional
 from curators.base import CuratorBot, safe_json_loads
 from curators.prompts import (
-    CRITIC_SYSTEM, COMMON_OUTPUT_RULES, CONVERSATION_RULES, NEXT_TURN_SUGGESTIONS
+    CRITIC_SYSTEM, CRITIC_THINK, COMMON_OUTPUT_RULES, CONVERSATION_RULES, NEXT_TURN_SUGGESTIONS
 )
 from utils.kobis import KobisClient
 
@@ -9,18 +9,14 @@ class CriticBot(CuratorBot):
     def __init__(self, kobis: KobisClient):
         super().__init__("🎓 영화전문가", CRITIC_SYSTEM, kobis)
 
-    def think_recommend(self, user_input: str, constraints: Dict) -> List[Dict]:
-        prompt = f"""
-사용자 요청: {user_input}
-
-전문가 관점에서 추천 영화 1~2편만 고르라.
-반드시 JSON 배열로만 출력:
-[
-  {{"title":"영화제목", "thesis":"왜 이 질문에 적합한지(짧게)"}},
-  ...
-]
-"""
-        raw = self.llm(prompt, temperature=0.8)
+    def think_recommend(
+        self,
+        user_input: str,
+        constraints: Dict,
+        on_title: Optional[Callable[[str], None]] = None,
+    ) -> List[Dict]:
+        prompt = f"사용자 요청: {user_input}" + self.similar_hint(constraints)
+        raw = self.think_llm(prompt, 0.8, self.think_cache_key(user_input, constraints, prompt), CRITIC_THINK, on_title)
         data = safe_json_loads(raw)
         if isinstance(data, list) and data:
             out = []
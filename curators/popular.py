@@ -1,40 +1,48 @@
 from datetime import datetime, timedelta
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional
 
 from curators.base import CuratorBot, safe_json_loads
 from curators.prompts import (
-    POPULAR_SYSTEM, COMMON_OUTPUT_RULES, CONVERSATION_RULES, NEXT_TURN_SUGGESTIONS
+    POPULAR_SYSTEM, POPULAR_THINK, COMMON_OUTPUT_RULES, CONVERSATION_RULES, NEXT_TURN_SUGGESTIONS
 )
+from utils.boxoffice import BoxofficeService
 from utils.kobis import KobisClient
 
 class PopularBot(CuratorBot):
-    def __init__(self, kobis: KobisClient):
+    def __init__(self, kobis: KobisClient, boxoffice: Optional[BoxofficeService] = None):
         super().__init__("🍿 대중관객", POPULAR_SYSTEM, kobis)
+        self.boxoffice = boxoffice
 
-    def think_recommend(self, user_input: str, constraints: Dict) -> List[Dict]:
-        # 1) 박스오피스에서 씨드 뽑기 (전일)
-        seed_titles: List[str] = []
+    def seed_titles(self) -> List[str]:
+        # 박스오피스에서 씨드 뽑기 (전일)
         try:
+            if self.boxoffice:
+                # 공유 스냅샷에서 꺼냄 (네트워크 없음)
+                return self.boxoffice.daily_titles()
             target = (datetime.now() - timedelta(days=1)).strftime("%Y%m%d")
             data = self.kobis.daily_boxoffice(targetDt=target, itemPerPage=10)
             items = data.get("boxOfficeResult", {}).get("dailyBoxOfficeList", []) or []
-            seed_titles = [x.get("movieNm") for x in items if x.get("movieNm")]
+            return [x.get("movieNm") for x in items if x.get("movieNm")]
         except Exception:
-            seed_titles = []
+            return []
+
+    def hints(self, user_input: str) -> str:
+        seeds = self.seed_titles()
+        return f"트렌드 후보: {seeds[:8]}" if seeds else ""
+
+    def think_recommend(
+        self,
+        user_input: str,
+        constraints: Dict,
+        on_title: Optional[Callable[[str], None]] = None,
+    ) -> List[Dict]:
+        # 1) 박스오피스 씨드
+        seed_titles = self.seed_titles()
 
         # 2) LLM에 1~2편 최종 선택을 맡김
-        prompt = f"""
-사용자 요청: {user_input}
-가능하면 아래 트렌드 후보를 참고해서, 오늘 당장 보기 좋은 영화 1~2편을 골라라.
-트렌드 후보: {seed_titles[:8]}
-
-반드시 JSON 배열로만 출력:
-[
-  {{"title":"영화제목", "why":"이유(짧게)"}},
-  ...
-]
-"""
-        raw = self.llm(prompt, temperature=0.7)
+        prompt = f"""사용자 요청: {user_input}
+트렌드 후보: {seed_titles[:8]}""" + self.similar_hint(constraints)
+        raw = self.think_llm(prompt, 0.7, self.think_cache_key(user_input, constraints, prompt), POPULAR_THINK, on_title)
         data = safe_json_loads(raw)
         if isinstance(data, list) and data:
             out = []
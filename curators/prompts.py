@@ -37,6 +37,63 @@ CONVERSATION_RULES = """
 NEXT_TURN_SUGGESTIONS = """
 """
 
+# -----------------------------
+# 한 번에 고르고 말하기 (one-shot) - 응답 규칙 뒤에 붙는 고정 접두
+# -----------------------------
+ONE_SHOT_FORMAT = """
+[출력 형식]
+영화 1편을 직접 골라서, 위 규칙대로 그 영화를 추천하는 발화까지 한 번에 써라.
+이미 언급된 영화는 고르지 마라. 실제로 개봉한 영화의 정확한 한국어 제목을 써라.
+
+반드시 JSON 객체로만 출력:
+{"title":"영화제목", "message":"추천 발화 전체"}
+"""
+
+# 고른 영화가 확인되지 않거나 이미 언급된 경우 (같은 접두 + 짧은 유저 메시지)
+REPAIR_REQUEST = """[직전 답변]
+{message}
+
+[문제]
+'{title}'은(는) {reason}.
+이 영화 대신 다른 영화 1편으로 바꿔서, 같은 말투와 흐름으로 다시 써라."""
+
+# -----------------------------
+# 후보 고르기(think) 지시문 - 고정 접두로 보냄 (사용자 요청은 유저 메시지 뒤쪽에)
+# -----------------------------
+CINEPHILE_THINK = """
+덕후 관점에서 사용자 요청에 맞는 추천 영화 1~2편만 고르라.
+필모 힌트가 있으면 참고해도 된다(없어도 됨).
+비슷한 후보(카탈로그)가 있으면 우선 그 안에서 고르라.
+
+반드시 JSON 배열로만 출력:
+[
+  {"title":"영화제목", "why":"덕후스러운 이유(짧게)", "risk":"취향탈 요소(짧게)"},
+  ...
+]
+"""
+
+CRITIC_THINK = """
+전문가 관점에서 사용자 요청에 맞는 추천 영화 1~2편만 고르라.
+비슷한 후보(카탈로그)가 있으면 우선 그 안에서 고르라.
+
+반드시 JSON 배열로만 출력:
+[
+  {"title":"영화제목", "thesis":"왜 이 질문에 적합한지(짧게)"},
+  ...
+]
+"""
+
+POPULAR_THINK = """
+가능하면 트렌드 후보를 참고해서, 오늘 당장 보기 좋은 영화 1~2편을 골라라.
+비슷한 후보(카탈로그)가 있으면 우선 그 안에서 고르라.
+
+반드시 JSON 배열로만 출력:
+[
+  {"title":"영화제목", "why":"이유(짧게)"},
+  ...
+]
+"""
+
 CINEPHILE_SYSTEM = """
 너는 자칭 영화덕후다.
 영화를 분석하기보다 사랑한다.
@@ -1,49 +1,61 @@
-import re
+import asyncio
+import contextvars
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple
-
+from queue import Queue
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from container import AppContainer, get_container
+from utils import intent as intent_rules
+from utils import trace
+from utils.batch import default_batcher, generate_many
+from utils.boxoffice import BoxofficeService
+from utils.people import PeopleResolver
+from utils.quota import QuotaExceeded
+from utils.sessions import TitleSet, ensure_titles
 from utils.kobis import KobisClient
-from curators.cinephile import CinephileBot
-from curators.critic import CriticBot
-from curators.popular import PopularBot
+from utils.tmdb import prefetch_posters
 
 
 # -----------------------------
 # Intent 분류 (간단·안정)
 # -----------------------------
+@trace.traced("classify_intent")
 def classify_intent(text: str) -> Dict:
-    t = text.strip()
-
-    if "감독" in t:
-        m = re.search(r"(.+?)\s*감독", t)
-        return {"type": "recommend", "criteria": "director", "value": m.group(1).strip() if m else ""}
-
-    if "배우" in t or "출연" in t:
-        m = re.search(r"(.+?)\s*(배우|출연)", t)
-        return {"type": "recommend", "criteria": "actor", "value": m.group(1).strip() if m else ""}
-
-    if any(k in t for k in ["박스오피스", "흥행", "유명", "명작", "시대", "년대"]):
-        return {"type": "recommend", "criteria": "boxoffice", "value": None}
-
-    return {"type": "curation", "criteria": None, "value": None}
+    # 규칙은 utils/intent_rules.json (한 번 컴파일해서 입력을 한 번만 훑음)
+    return intent_rules.classify(text)
 
 
 # -----------------------------
 # API 기반 후보 생성
 # -----------------------------
-def build_api_candidates(kobis: KobisClient, intent: Dict, used_titles: List[str]) -> List[str]:
+@trace.traced("build_api_candidates")
+def build_api_candidates(
+    kobis: KobisClient,
+    intent: Dict,
+    used_titles: TitleSet,
+    boxoffice: Optional[BoxofficeService] = None,
+    people: Optional[PeopleResolver] = None,
+) -> List[str]:
     titles = []
 
     # -----------------------------
     # 감독 기반
     # -----------------------------
     if intent["criteria"] == "director" and intent["value"]:
-        data = kobis.search_movie_list(
-            directorNm=intent["value"],
-            itemPerPage=30
-        )
-        for m in data:
-            name = m.get("movieNm") # type: ignore
+        names = people.ranked_titles(intent["value"], role="감독") if people else []
+        if not names:
+            try:
+                data = kobis.search_movie_list(
+                    directorNm=intent["value"],
+                    itemPerPage=30
+                )
+            except QuotaExceeded:
+                data = {}
+            names = [m.get("movieNm") for m in data.get("movieListResult", {}).get("movieList", []) or []]
+        for name in names:
             if name and name not in used_titles:
                 titles.append(name)
 
@@ -51,32 +63,41 @@ def build_api_candidates(kobis: KobisClient, intent: Dict, used_titles: List[str
     # 배우 기반
     # -----------------------------
     elif intent["criteria"] == "actor" and intent["value"]:
-        people = kobis.search_people_list(
-            peopleNm=intent["value"],
-            itemPerPage=5
-        )
         if people:
-            people_cd = people[0].get("peopleCd") # type: ignore
-            if people_cd:
-                info = kobis.search_people_info(people_cd)
-                filmos = info.get("filmos", [])
-                for f in filmos:
-                    name = f.get("movieNm")
-                    if name and name not in used_titles:
-                        titles.append(name)
+            # 캐시된 인물 해석 + 랭킹된 필모 (반복 조회는 네트워크 없음)
+            names = people.ranked_titles(intent["value"], role="배우")
+        else:
+            names = []
+            data = kobis.search_people_list(
+                peopleNm=intent["value"],
+                itemPerPage=5
+            )
+            plist = data.get("peopleListResult", {}).get("peopleList", []) or []
+            if plist and plist[0].get("peopleCd"):
+                info = kobis.search_people_info(plist[0]["peopleCd"])
+                filmos = info.get("peopleInfoResult", {}).get("peopleInfo", {}).get("filmos", []) or []
+                names = [f.get("movieNm") for f in filmos]
+        for name in names:
+            if name and name not in used_titles:
+                titles.append(name)
 
     # -----------------------------
     # 박스오피스 기반
     # -----------------------------
     elif intent["criteria"] == "boxoffice":
-        date = (datetime.now() - timedelta(days=1)).strftime("%Y%m%d")
-        data = kobis.search_weekly_boxoffice_list( # type: ignore
-            targetDt=date,
-            weekGb="0",
-            itemPerPage=10
-        )
-        for m in data:
-            name = m.get("movieNm")
+        if boxoffice:
+            # 공유 스냅샷에서 꺼냄 (네트워크 없음)
+            names = boxoffice.weekly_titles()
+        else:
+            # 주간 집계는 주가 끝나야 나오므로 일주일 전 기준
+            date = (datetime.now() - timedelta(days=7)).strftime("%Y%m%d")
+            data = kobis.weekly_boxoffice(
+                targetDt=date,
+                weekGb="0",
+                itemPerPage=10
+            )
+            names = [m.get("movieNm") for m in data.get("boxOfficeResult", {}).get("weeklyBoxOfficeList", []) or []]
+        for name in names:
             if name and name not in used_titles:
                 titles.append(name)
 
@@ -91,103 +112,331 @@ def build_api_candidates(kobis: KobisClient, intent: Dict, used_titles: List[str
 
 
 # -----------------------------
-# 메인 엔트리
+# 병렬 실행 헬퍼
 # -----------------------------
-def run_turn(user_input: str, context: Dict, targets: List[str]) -> Tuple[List[Dict], Dict]:
-    context.setdefault("used_titles", [])
+def _fan_out(fn: Callable, items: List, concurrent: bool) -> List:
+    # 입력 순서대로 결과를 돌려줌 (병렬이어도 순서 보장)
+    if not concurrent or len(items) <= 1:
+        return [fn(x) for x in items]
+    # 작업마다 trace 문맥을 복사해서 넘김 (봇 span이 run_turn 아래로 묶이도록)
+    with ThreadPoolExecutor(max_workers=len(items)) as ex:
+        futures = [ex.submit(contextvars.copy_context().run, fn, x) for x in items]
+        return [f.result() for f in futures]
+
+
+def _reserve_titles(bots: List, ideas_per_bot: List[List[Dict]], used_titles: TitleSet) -> List[Tuple]:
+    # 봇 순서대로 후보를 예약 → 병렬로 생각해도 중복 제거 결과는 항상 같음
+    reserved: set = set()
+    assignments = []
+    for bot, ideas in zip(bots, ideas_per_bot):
+        for i in ideas:
+            title = i.get("title")
+            if title and title not in used_titles and title not in reserved:
+                reserved.add(title)
+                assignments.append((bot, title))
+                break
+    return assignments
 
-    kobis = KobisClient()
 
-    bots = {
-        "영화덕후": CinephileBot(kobis),
-        "영화전문가": CriticBot(kobis),
-        "대중관객": PopularBot(kobis),
-    }
+# -----------------------------
+# one-shot 큐레이션: 봇마다 한 번의 호출로 제목 + 발화
+# 확인 안 되는 제목/이미 나온 제목만 짧은 수정 호출 한 번 더, 그래도 안 되면 그 봇만 2단계(think → respond)
+# -----------------------------
+ONE_SHOT = os.getenv("ONE_SHOT", "off").lower() in ("on", "1", "true")
+
+
+def _verify(titles: List[str], concurrent: bool, container: AppContainer) -> Dict:
+    if not titles:
+        return {}
+    with trace.span("verify_movies", batched=len(titles)):
+        if concurrent:
+            return asyncio.run(container.async_kobis.verify_titles(titles))
+        return container.kobis.verify_titles(titles)
+
+
+def _one_shot_turn(
+    user_input: str,
+    bots: List,
+    used_titles: TitleSet,
+    concurrent: bool,
+    container: AppContainer,
+) -> Tuple[List[Tuple], Dict, Dict[str, str]]:
+    def draft(bot) -> Optional[Dict]:
+        with trace.span("one_shot", bot=bot.label):
+            return bot.one_shot(user_input, used_titles)
+
+    drafts = _fan_out(draft, bots, concurrent)
+    verified = _verify([d["title"] for d in drafts if d], concurrent, container)
+
+    # 봇 순서대로 예약 (앞 봇이 먼저 고른 제목은 뒤 봇에게 "이미 언급됨")
+    taken: List[str] = []
+    problems: List[Tuple] = []
+    for i, d in enumerate(drafts):
+        if not d:
+            continue
+        if d["title"] in used_titles or d["title"] in taken:
+            problems.append((i, "이미 언급된 영화"))
+        elif not verified.get(d["title"], {}).get("found"):
+            problems.append((i, "KOBIS에서 확인되지 않는 제목"))
+        else:
+            taken.append(d["title"])
+
+    if problems:
+        seen = used_titles + taken
+
+        def fix(p: Tuple) -> Optional[Dict]:
+            i, reason = p
+            with trace.span("repair", bot=bots[i].label, reason=reason):
+                return bots[i].repair(user_input, drafts[i], reason, seen)
+
+        fixed = _fan_out(fix, problems, concurrent)
+        verified.update(_verify(list(dict.fromkeys(f["title"] for f in fixed if f and f["title"] not in verified)), concurrent, container))
+        for (i, _), f in zip(problems, fixed):
+            # 수정은 한 번만 - 그래도 겹치거나 확인이 안 되면 아래 2단계 흐름으로
+            ok = f and f["title"] not in used_titles and f["title"] not in taken and verified.get(f["title"], {}).get("found")
+            drafts[i] = f if ok else None
+            if drafts[i]:
+                taken.append(drafts[i]["title"])
+
+    # 초안이 없거나(파싱 실패) 수정도 안 된 봇은 think → respond 로 (one-shot이라고 봇이 빠지지 않게)
+    missing = [bot for bot, d in zip(bots, drafts) if not d]
+    fallback: Dict[str, str] = {}
+    if missing:
+        forbidden = used_titles + taken
+
+        def think(bot) -> List[Dict]:
+            with trace.span("think_recommend", bot=bot.label, fallback="one_shot"):
+                return bot.think_recommend(user_input=user_input, constraints={"forbidden_titles": forbidden})
+
+        ideas_per_bot = _fan_out(think, missing, concurrent)
+        fallback = {bot.label: title for bot, title in _reserve_titles(missing, ideas_per_bot, forbidden)}
+        verified.update(_verify([t for t in fallback.values() if t not in verified], concurrent, container))
+
+    assignments = [
+        (bot, d["title"] if d else fallback[bot.label])
+        for bot, d in zip(bots, drafts)
+        if d or bot.label in fallback
+    ]
+    messages = {bot.label: d["message"] for bot, d in zip(bots, drafts) if d}
+    return assignments, verified, messages
 
-    selected_bots = (
-        bots.values()
-        if "모두" in targets
-        else [bots[t] for t in targets if t in bots]
-    )
 
-    intent = classify_intent(user_input)
-    responses = []
+# -----------------------------
+# 추측 검증: think 스트림에서 제목이 보이는 즉시 KOBIS 검증 + 포스터 조회 시작
+# (LLM이 나머지를 쓰는 동안 네트워크가 같이 돎 - 배정 안 된 제목도 캐시만 데워짐)
+# -----------------------------
+SPECULATE = os.getenv("SPECULATIVE_VERIFY", "on").lower() not in ("off", "0", "false")
+_speculate_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="speculate")
+
+
+class _Speculation:
+    def __init__(self, container: AppContainer):
+        self.kobis = container.kobis
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def on_title(self, title: str) -> None:
+        with self._lock:
+            if title in self._futures:
+                return
+            self._futures[title] = _speculate_pool.submit(contextvars.copy_context().run, self._verify, title)
+        prefetch_posters([title])
+
+    def _verify(self, title: str) -> Optional[Dict]:
+        with trace.span("verify_movies", speculative=True):
+            return self.kobis.verify_titles([title]).get(title)
+
+    def results(self, titles: List[str]) -> Dict:
+        out: Dict = {}
+        for t in titles:
+            f = self._futures.get(t)
+            if f is None:
+                continue
+            try:
+                facts = f.result()
+            except Exception:
+                continue
+            if facts is not None:
+                out[t] = facts
+        return out
 
-    # -----------------------------
-    # 추천: API가 후보 생성
-    # -----------------------------
-    if intent["type"] == "recommend":
-        candidates = build_api_candidates(kobis, intent, context["used_titles"])
 
-        for bot in selected_bots:
-            if not candidates:
-                break
+# -----------------------------
+# 미리 만든 추천 풀: 분위기/장르 요청이면 봇별 풀에서 아직 안 쓴 제목을 바로 (think 생략)
+# -----------------------------
+def _pool_picks(bots: List, constraints: Dict, used_titles: TitleSet, container: AppContainer) -> Dict[str, Dict]:
+    picks: Dict[str, Dict] = {}
+    if not constraints or not container.pools.ready():
+        return picks
+    taken: set = set()
+    for bot in bots:
+        with trace.span("reco_pool", bot=bot.label) as sp:
+            entry = container.pools.pick(bot.label, constraints, lambda t: t in used_titles or t in taken)
+            sp.set(cache="hit" if entry else "miss")
+        if entry:
+            picks[bot.label] = entry
+            taken.add(entry["title"])
+    return picks
 
-            title = candidates.pop(0)
-            ideas = [{"title": title}]
-            facts = bot.verify_movies([title])
 
-            text, picked = bot.respond(
-                user_input=user_input,
-                ideas=ideas,
-                facts=facts,
-                constraints={"forbidden_titles": context["used_titles"]},
-                previous_messages="",
-                used_titles=context["used_titles"],
-            )
+# -----------------------------
+# 유사 영화 인덱스: "OO랑 비슷한" 요청이면 카탈로그 벡터 검색으로 확인된 후보를 think 전에
+# -----------------------------
+def _similar_candidates(user_input: str, skip, container: AppContainer) -> List[Dict]:
+    if container.similar is None:
+        return []
+    with trace.span("similar_index") as sp:
+        found = container.similar.candidates(user_input, skip_titles=skip)
+        sp.set(hits=len(found))
+    return found
 
-            context["used_titles"].extend(picked)
 
-            responses.append({
-                "role": "assistant",
-                "speaker": bot.label,
-                "text": text,
-                "movie_title": picked[0] if picked else title,
-            })
+# -----------------------------
+# 턴 준비: 봇 선택 → 후보 배정 → 검증
+# -----------------------------
+def _plan_turn(
+    user_input: str,
+    context: Dict,
+    targets: List[str],
+    concurrent: bool,
+    container: AppContainer,
+    one_shot: bool = False,
+) -> Tuple[List[Tuple], Dict, Dict[str, str]]:
+    # 언급된 영화는 순서 있는 집합 (in 검사 O(1), 세션당 개수 상한)
+    ensure_titles(context)
+
+    kobis = container.kobis
+    selected_bots = container.select_bots(targets)
 
-    # -----------------------------
-    # 큐레이션: LLM이 후보 생성
-    # -----------------------------
-    else:
-        for bot in selected_bots:
-            ideas = bot.think_recommend(
-                user_input=user_input,
-                constraints={"forbidden_titles": context["used_titles"]}
-            )
+    intent = classify_intent(user_input)
+    used_titles = context["used_titles"]
 
-            ideas = [
-                i for i in ideas
-                if i.get("title") and i["title"] not in context["used_titles"]
-            ]
+    turn_span = trace.current()
+    if turn_span:
+        turn_span.set(intent=intent["criteria"] or intent["type"])
 
-            if not ideas:
-                continue
+    speculation: Optional[_Speculation] = None
+    similar: List[Dict] = []
+    picks = _pool_picks(selected_bots, intent["constraints"], used_titles, container) if intent["type"] == "curation" else {}
 
-            title = ideas[0]["title"]
-            facts = bot.verify_movies([title])
-
-            text, picked = bot.respond(
-                user_input=user_input,
-                ideas=[{"title": title}],
-                facts=facts,
-                constraints={"forbidden_titles": context["used_titles"]},
-                previous_messages="",
-                used_titles=context["used_titles"],
-            )
+    # -----------------------------
+    # 추천: API가 후보 생성 (봇 순서대로 미리 배정)
+    # -----------------------------
+    if intent["type"] == "recommend":
+        candidates = build_api_candidates(kobis, intent, used_titles, container.boxoffice, container.people)
+        assignments = list(zip(selected_bots, candidates))
 
-            context["used_titles"].extend(picked)
+    # -----------------------------
+    # 큐레이션 (one-shot): 고르기 + 발화를 한 번에, 검증까지 끝난 상태로 돌려줌
+    # -----------------------------
+    elif one_shot and not picks:
+        assignments, verified, drafts = _one_shot_turn(user_input, selected_bots, used_titles, concurrent, container)
+        prefetch_posters([t for _, t in assignments])
+        return assignments, verified, drafts
 
-            responses.append({
-                "role": "assistant",
-                "speaker": bot.label,
-                "text": text,
-                "movie_title": picked[0] if picked else title,
-            })
+    # -----------------------------
+    # 큐레이션: LLM이 후보 생성 (병렬로 생각 → 순서대로 예약)
+    # 풀에서 제목을 받은 봇은 think 없이 그 제목으로
+    # -----------------------------
+    else:
+        rest = [bot for bot in selected_bots if bot.label not in picks]
+        forbidden = used_titles + [e["title"] for e in picks.values()] if picks else used_titles
+        similar = _similar_candidates(user_input, forbidden, container) if rest else []
+
+        # 병렬 모드면 think를 스트리밍으로 받아 제목마다 검증을 먼저 시작
+        if concurrent and SPECULATE and rest:
+            speculation = _Speculation(container)
+
+        def think(bot) -> List[Dict]:
+            with trace.span("think_recommend", bot=bot.label):
+                return bot.think_recommend(
+                    user_input=user_input,
+                    constraints={"forbidden_titles": forbidden, "similar_titles": [f["movieNm"] for f in similar]},
+                    on_title=speculation.on_title if speculation else None,
+                )
+
+        thought = dict(zip([bot.label for bot in rest], _fan_out(think, rest, concurrent)))
+        ideas_per_bot = [
+            [{"title": picks[bot.label]["title"]}] if bot.label in picks else thought[bot.label]
+            for bot in selected_bots
+        ]
+        assignments = _reserve_titles(selected_bots, ideas_per_bot, used_titles)
+
+    # 포스터는 제목이 정해지자마자 백그라운드 조회 (렌더링 때는 캐시에서)
+    prefetch_posters([t for _, t in assignments])
 
     # -----------------------------
-    # 진행자 발화 (항상 마지막)
+    # 검증: 추측 검증이 끝난 제목은 그 결과를, 나머지는 병렬 모드면 한 번에 동시 조회
     # -----------------------------
-    responses.append({
+    titles = [t.strip() for _, t in assignments]
+    # 풀/유사 인덱스에서 온 제목은 이미 확인된 것 (KOBIS 다시 안 감)
+    verified: Dict = {f["movieNm"]: f for f in similar if f["movieNm"] in titles}
+    verified.update({e["title"]: e["facts"] for e in picks.values()})
+    if speculation:
+        verified.update(speculation.results(titles))
+    rest = [t for t in titles if t not in verified]
+    if concurrent and rest:
+        verified.update(_verify(rest, concurrent, container))
+
+    return assignments, verified, {}
+
+
+def _respond_kwargs(user_input: str, assignments: List[Tuple], i: int, verified: Dict, used_titles: TitleSet) -> Dict:
+    # 각 봇은 앞 순서 봇이 예약한 제목까지 "이미 언급된 영화"로 본다
+    bot, title = assignments[i]
+    seen = used_titles + [t for _, t in assignments[:i]]
+    key = title.strip()
+    if key in verified:
+        facts = {key: verified[key]}
+    else:
+        with trace.span("verify_movies", bot=bot.label):
+            facts = bot.verify_movies([title])
+    return dict(
+        user_input=user_input,
+        ideas=[{"title": title}],
+        facts=facts,
+        constraints={"forbidden_titles": seen},
+        previous_messages="",
+        used_titles=seen,
+    )
+
+
+# -----------------------------
+# 묶음 생성 (LLM_BATCH)
+# combined: 한 턴의 봇 발화를 구조화 호출 한 번으로 / queue: 여러 세션의 발화 요청을 잠깐 모아서 한 번에
+# 묶음 응답에서 빠진 봇은 평소처럼 개별 호출
+# -----------------------------
+BATCH = os.getenv("LLM_BATCH", "off").lower()
+
+
+def _combined_drafts(
+    user_input: str,
+    assignments: List[Tuple],
+    verified: Dict,
+    used_titles: TitleSet,
+    drafts: Dict[str, str],
+) -> Dict[str, str]:
+    pending = [i for i, (bot, _) in enumerate(assignments) if bot.label not in drafts]
+    if len(pending) < 2:
+        return {}
+    tasks = []
+    for i in pending:
+        bot = assignments[i][0]
+        static, prompt, _ = bot.recommend_prompt(**_respond_kwargs(user_input, assignments, i, verified, used_titles))
+        tasks.append({"id": str(i), "role": bot.label, "system": bot.system, "static": static, "user": prompt})
+    with trace.span("respond", batched=len(tasks)):
+        out = generate_many(tasks)
+    return {assignments[int(k)][0].label: text for k, text in out.items()}
+
+
+def _queued_respond(bot, kwargs: Dict) -> Tuple[str, List[str]]:
+    static, prompt, picked = bot.recommend_prompt(**kwargs)
+    with trace.span("respond", bot=bot.label, queued=True):
+        return default_batcher().generate(bot.label, bot.system, static, prompt), picked
+
+
+def _host_message() -> Dict:
+    return {
         "role": "assistant",
         "speaker": "🎤 진행자",
         "text": (
@@ -195,6 +444,157 @@ def run_turn(user_input: str, context: Dict, targets: List[str]) -> Tuple[List[D
             "아니면 기준을 바꿔볼까?\n"
             "예) 배우로 다시 추천 / 분위기 더 가볍게 / 연말 감성으로"
         )
-    })
+    }
+
+
+# -----------------------------
+# 메인 엔트리
+# -----------------------------
+@trace.traced("run_turn")
+def run_turn(
+    user_input: str,
+    context: Dict,
+    targets: List[str],
+    concurrent: bool = True,
+    container: Optional[AppContainer] = None,
+    one_shot: Optional[bool] = None,
+    batch: Optional[str] = None,
+) -> Tuple[List[Dict], Dict]:
+    assignments, verified, drafts = _plan_turn(
+        user_input, context, targets, concurrent, container or get_container(),
+        one_shot=ONE_SHOT if one_shot is None else one_shot,
+    )
+    used_titles = context["used_titles"]
+    batch = BATCH if batch is None else batch
+    if batch == "combined":
+        drafts.update(_combined_drafts(user_input, assignments, verified, used_titles, drafts))
+
+    # -----------------------------
+    # 발화 (봇별 병렬, one-shot/묶음이면 이미 써둔 발화)
+    # -----------------------------
+    def speak(i: int) -> Tuple[str, List[str]]:
+        bot, title = assignments[i]
+        if bot.label in drafts:
+            return drafts[bot.label], [title]
+        kwargs = _respond_kwargs(user_input, assignments, i, verified, used_titles)
+        if batch == "queue":
+            return _queued_respond(bot, kwargs)
+        with trace.span("respond", bot=bot.label):
+            return bot.respond(**kwargs)
+
+    results = _fan_out(speak, list(range(len(assignments))), concurrent)
+
+    responses = []
+    for (bot, title), (text, picked) in zip(assignments, results):
+        used_titles.extend(picked)
+        responses.append({
+            "role": "assistant",
+            "speaker": bot.label,
+            "text": text,
+            "movie_title": picked[0] if picked else title,
+        })
+
+    # 진행자 발화 (항상 마지막)
+    responses.append(_host_message())
 
     return responses, context
+
+
+# -----------------------------
+# 스트리밍 엔트리
+# 이벤트: start(speaker, movie_title) → delta(text)... → end(message), 마지막에 done(context)
+# -----------------------------
+@trace.traced("run_turn", stream=True)
+def run_turn_stream(
+    user_input: str,
+    context: Dict,
+    targets: List[str],
+    concurrent: bool = True,
+    container: Optional[AppContainer] = None,
+    one_shot: Optional[bool] = None,
+    batch: Optional[str] = None,
+) -> Iterator[Dict]:
+    assignments, verified, drafts = _plan_turn(
+        user_input, context, targets, concurrent, container or get_container(),
+        one_shot=ONE_SHOT if one_shot is None else one_shot,
+    )
+    used_titles = context["used_titles"]
+    batch = BATCH if batch is None else batch
+    if batch == "combined":
+        drafts.update(_combined_drafts(user_input, assignments, verified, used_titles, drafts))
+
+    def open_stream(i: int) -> Tuple[Iterator[str], List[str]]:
+        bot, title = assignments[i]
+        if bot.label in drafts:
+            # one-shot/묶음은 발화가 통째로 와 있음 (조각 하나로)
+            return iter([drafts[bot.label]]), [title]
+        kwargs = _respond_kwargs(user_input, assignments, i, verified, used_titles)
+        if batch == "queue":
+            text, picked = _queued_respond(bot, kwargs)
+            return iter([text]), picked
+        deltas, picked = bot.respond(stream=True, **kwargs)
+        return trace.traced_stream("respond", deltas, bot=bot.label), picked
+
+    # 병렬 모드: 모든 봇의 스트림을 미리 열어 큐에 받아두고, 화면에는 순서대로 흘려보냄
+    queues: List["Queue"] = []
+    pool = None
+    if concurrent and len(assignments) > 1:
+        pool = ThreadPoolExecutor(max_workers=len(assignments))
+        for i in range(len(assignments)):
+            q: "Queue" = Queue()
+            queues.append(q)
+            pool.submit(contextvars.copy_context().run, _pump, open_stream, i, q)
+
+    try:
+        for i, (bot, title) in enumerate(assignments):
+            if pool:
+                deltas: Iterator[str] = _drain(queues[i])
+                picked = [title]
+            else:
+                deltas, picked = open_stream(i)
+
+            yield {"type": "start", "speaker": bot.label, "movie_title": picked[0] if picked else title}
+            chunks = []
+            for d in deltas:
+                chunks.append(d)
+                yield {"type": "delta", "text": d}
+
+            used_titles.extend(picked)
+            yield {"type": "end", "message": {
+                "role": "assistant",
+                "speaker": bot.label,
+                "text": "".join(chunks).strip(),
+                "movie_title": picked[0] if picked else title,
+            }}
+    finally:
+        if pool:
+            pool.shutdown(wait=False)
+
+    host = _host_message()
+    yield {"type": "start", "speaker": host["speaker"], "movie_title": None}
+    yield {"type": "delta", "text": host["text"]}
+    yield {"type": "end", "message": host}
+    yield {"type": "done", "context": context}
+
+
+_END = object()
+
+
+def _pump(open_stream: Callable, i: int, q: "Queue") -> None:
+    try:
+        deltas, _ = open_stream(i)
+        for d in deltas:
+            q.put(d)
+    except Exception as e:
+        q.put(e)
+    q.put(_END)
+
+
+def _drain(q: "Queue") -> Iterator[str]:
+    while True:
+        item = q.get()
+        if item is _END:
+            return
+        if isinstance(item, Exception):
+            raise item
+        yield item
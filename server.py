@@ -0,0 +1,284 @@
+import asyncio
+import contextvars
+import json
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from container import get_container
+from main import run_turn, run_turn_stream
+from utils import trace
+from utils.sessions import Session, default_store
+
+# -----------------------------
+# 설정
+# SERVER_WORKERS: 동시에 돌리는 턴 수, SERVER_QUEUE: 그 위로 기다릴 수 있는 턴 수
+# 둘 다 차면 429 + Retry-After (큐가 끝없이 쌓이지 않도록)
+# -----------------------------
+WORKERS = int(os.getenv("SERVER_WORKERS", "8"))
+QUEUE = int(os.getenv("SERVER_QUEUE", "32"))
+RETRY_AFTER = int(os.getenv("SERVER_RETRY_AFTER", "2"))
+TARGETS = ["모두", "영화덕후", "영화전문가", "대중관객"]
+
+
+# -----------------------------
+# 턴 실행 풀 (실행 중 + 대기 중 합계를 제한)
+# -----------------------------
+class TurnPool:
+    def __init__(self, workers: int = WORKERS, queue: int = QUEUE):
+        self.workers = workers
+        self.capacity = workers + queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="turn")
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    def try_submit(self, fn: Callable, *args) -> Optional[Future]:
+        with self._lock:
+            if self._pending >= self.capacity:
+                return None
+            self._pending += 1
+        fut = self._executor.submit(contextvars.copy_context().run, fn, *args)
+        fut.add_done_callback(self._release)
+        return fut
+
+    def _release(self, _: Future) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            pending = self._pending
+        return {
+            "workers": self.workers,
+            "capacity": self.capacity,
+            "running": min(pending, self.workers),
+            "queued": max(pending - self.workers, 0),
+        }
+
+
+store = default_store()
+pool = TurnPool()
+
+
+def _error(status: int, message: str, **headers: str) -> JSONResponse:
+    return JSONResponse({"error": message}, status_code=status, headers=headers)
+
+
+def _busy() -> JSONResponse:
+    return _error(429, "server busy", **{"Retry-After": str(RETRY_AFTER)})
+
+
+async def _turn_request(request: Request):
+    # 세션 + 입력 검증 → (session, text, targets, one_shot) 또는 에러 응답
+    session = store.get(request.path_params["session_id"])
+    if session is None:
+        return _error(404, "unknown session")
+    try:
+        body = await request.json()
+    except Exception:
+        return _error(400, "invalid JSON body")
+    if not isinstance(body, dict):
+        return _error(400, "invalid JSON body")
+    text = str(body.get("text") or "").strip()
+    if not text:
+        return _error(400, "text is required")
+    targets = body.get("targets") or ["모두"]
+    if not isinstance(targets, list) or not all(t in TARGETS for t in targets):
+        return _error(400, f"targets must be a subset of {TARGETS}")
+    one_shot = body.get("one_shot")
+    return session, text, targets, one_shot if isinstance(one_shot, bool) else None
+
+
+def _user_message(text: str) -> Dict:
+    return {"role": "user", "speaker": "🙋 나", "text": text}
+
+
+# -----------------------------
+# 세션
+# -----------------------------
+async def create_session(request: Request) -> Response:
+    return JSONResponse({"session_id": store.create().id}, status_code=201)
+
+
+async def get_session(request: Request) -> Response:
+    session = store.get(request.path_params["session_id"])
+    if session is None:
+        return _error(404, "unknown session")
+    return JSONResponse(session.to_dict())
+
+
+async def get_history(request: Request) -> Response:
+    # 창 밖 메시지는 보관소에서 페이지 단위로 (?before=seq&limit=n)
+    session = store.get(request.path_params["session_id"])
+    if session is None:
+        return _error(404, "unknown session")
+    try:
+        before = request.query_params.get("before")
+        limit = min(int(request.query_params.get("limit", "50")), 200)
+        messages = session.history(int(before) if before is not None else None, limit)
+    except ValueError:
+        return _error(400, "before/limit must be integers")
+    return JSONResponse({"session_id": session.id, "messages": messages})
+
+
+async def delete_session(request: Request) -> Response:
+    if not store.delete(request.path_params["session_id"]):
+        return _error(404, "unknown session")
+    return Response(status_code=204)
+
+
+# -----------------------------
+# 턴 (JSON)
+# -----------------------------
+def _run_turn(session: Session, text: str, targets: List[str], one_shot: Optional[bool]) -> List[Dict]:
+    try:
+        session.add_message(_user_message(text))
+        responses, _ = run_turn(
+            user_input=text, context=session.context, targets=targets,
+            container=get_container(), one_shot=one_shot,
+        )
+        for m in responses:
+            session.add_message(m)
+        return responses
+    finally:
+        session.lock.release()
+
+
+async def post_turn(request: Request) -> Response:
+    parsed = await _turn_request(request)
+    if isinstance(parsed, Response):
+        return parsed
+    session, text, targets, one_shot = parsed
+
+    # 같은 세션의 턴은 순서대로 (앞 턴이 아직 돌면 409)
+    if not session.lock.acquire(blocking=False):
+        return _error(409, "a turn is already running for this session")
+    fut = pool.try_submit(_run_turn, session, text, targets, one_shot)
+    if fut is None:
+        session.lock.release()
+        return _busy()
+
+    responses = await asyncio.wrap_future(fut)
+    return JSONResponse({
+        "session_id": session.id,
+        "messages": responses,
+        "used_titles": list(session.context.get("used_titles", [])),
+    })
+
+
+# -----------------------------
+# 턴 (SSE) - 워커 스레드가 이벤트를 asyncio 큐로 넘기고, 응답은 도착하는 대로 흘려보냄
+# 클라이언트가 끊으면 다음 이벤트에서 생성기를 닫아 워커를 돌려받음
+# -----------------------------
+_END = object()
+
+
+def _stream_turn(
+    session: Session,
+    text: str,
+    targets: List[str],
+    one_shot: Optional[bool],
+    emit: Callable[[object], None],
+    cancelled: threading.Event,
+) -> None:
+    events = None
+    try:
+        session.add_message(_user_message(text))
+        events = run_turn_stream(
+            user_input=text, context=session.context, targets=targets,
+            container=get_container(), one_shot=one_shot,
+        )
+        for ev in events:
+            if cancelled.is_set():
+                break
+            if ev["type"] == "end":
+                session.add_message(ev["message"])
+            if ev["type"] == "done":
+                ev = {"type": "done", "used_titles": list(session.context.get("used_titles", []))}
+            emit(ev)
+    except Exception as e:
+        emit({"type": "error", "error": type(e).__name__})
+    finally:
+        if events is not None:
+            events.close()
+        session.lock.release()
+        emit(_END)
+
+
+def _sse(ev: Dict) -> str:
+    return f"event: {ev['type']}\ndata: {json.dumps(ev, ensure_ascii=False)}\n\n"
+
+
+async def post_turn_stream(request: Request) -> Response:
+    parsed = await _turn_request(request)
+    if isinstance(parsed, Response):
+        return parsed
+    session, text, targets, one_shot = parsed
+
+    if not session.lock.acquire(blocking=False):
+        return _error(409, "a turn is already running for this session")
+
+    loop = asyncio.get_running_loop()
+    queue: "asyncio.Queue" = asyncio.Queue()
+    cancelled = threading.Event()
+
+    def emit(ev: object) -> None:
+        loop.call_soon_threadsafe(queue.put_nowait, ev)
+
+    fut = pool.try_submit(_stream_turn, session, text, targets, one_shot, emit, cancelled)
+    if fut is None:
+        session.lock.release()
+        return _busy()
+
+    async def body():
+        try:
+            while True:
+                ev = await queue.get()
+                if ev is _END:
+                    return
+                yield _sse(ev)
+        finally:
+            cancelled.set()
+
+    return StreamingResponse(body(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+# -----------------------------
+# 상태
+# -----------------------------
+async def healthz(request: Request) -> Response:
+    return JSONResponse({
+        "ok": True,
+        "sessions": len(store),
+        "evicted": store.evicted,
+        "pool": pool.stats(),
+        "kobis": get_container().kobis.limiter.stats(),
+    })
+
+
+async def metrics(request: Request) -> Response:
+    return PlainTextResponse(trace.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+app = Starlette(routes=[
+    Route("/sessions", create_session, methods=["POST"]),
+    Route("/sessions/{session_id}", get_session, methods=["GET"]),
+    Route("/sessions/{session_id}", delete_session, methods=["DELETE"]),
+    Route("/sessions/{session_id}/messages", get_history, methods=["GET"]),
+    Route("/sessions/{session_id}/turns", post_turn, methods=["POST"]),
+    Route("/sessions/{session_id}/turns/stream", post_turn_stream, methods=["POST"]),
+    Route("/healthz", healthz, methods=["GET"]),
+    Route("/metrics", metrics, methods=["GET"]),
+])
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host=os.getenv("SERVER_HOST", "0.0.0.0"), port=int(os.getenv("SERVER_PORT", "8000")))
@@ -0,0 +1,159 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from utils import trace
+from utils.llm import ask_llm
+
+# -----------------------------
+# 묶음 생성: 여러 페르소나 요청을 한 번의 구조화 호출로
+# 고정 접두 = 형식 안내 + (중복 제거한) 규칙 + 역할별 페르소나 → 같은 봇 조합이면 매번 같은 접두
+# -----------------------------
+MAX_BATCH = int(os.getenv("LLM_BATCH_MAX", "6"))
+MAX_WAIT = float(os.getenv("LLM_BATCH_MAX_WAIT_MS", "30")) / 1000
+
+BATCH_SYSTEM = """
+너는 여러 큐레이터의 답을 한 번에 대신 쓰는 작성자다.
+아래 [요청]들은 서로 독립적이다. 각 요청마다 지정된 [역할]의 말투와 성향, 지정된 [규칙]을 그대로 따르고,
+다른 요청의 내용이나 말투를 섞지 마라.
+
+반드시 JSON 객체로만 출력:
+{"answers":[{"id":"요청 id", "text":"그 역할로 쓴 답 전체"}, ...]}
+"""
+
+
+def _static(tasks: List[Dict]) -> Tuple[str, Dict[str, int]]:
+    rules = list(dict.fromkeys(t["static"] for t in tasks if t.get("static")))
+    roles = {t["role"]: t["system"] for t in tasks}
+    blocks = [f"[규칙 {i + 1}]\n{r.strip()}" for i, r in enumerate(rules)]
+    blocks += [f"[역할: {name}]\n{roles[name].strip()}" for name in sorted(roles)]
+    return "\n\n".join(blocks), {r: i + 1 for i, r in enumerate(rules)}
+
+
+def generate_many(tasks: List[Dict], temperature: float = 0.9) -> Dict[str, str]:
+    # tasks: {"id", "role", "system", "static", "user"} → {id: text} (빠진 id는 호출한 쪽이 개별로 다시)
+    static, rule_no = _static(tasks)
+    user = "\n\n".join(
+        f"[요청 {t['id']}]\n역할: {t['role']}\n규칙: {rule_no.get(t.get('static'), '없음')}\n{t['user']}"
+        for t in tasks
+    )
+    # 토큰은 묶음에 든 봇들 몫으로 (한 봇에게 다 붙지 않게)
+    bots = "+".join(sorted({t["role"] for t in tasks}))
+    with trace.span("llm_batch", size=len(tasks), bot=bots):
+        raw = ask_llm(BATCH_SYSTEM, user, temperature=temperature, static=static, json_mode=True)
+    try:
+        data = json.loads(raw)
+    except Exception:
+        data = None
+    answers = data.get("answers") if isinstance(data, dict) else None
+    out: Dict[str, str] = {}
+    ids = {str(t["id"]) for t in tasks}
+    for a in answers or []:
+        if isinstance(a, dict) and str(a.get("id")) in ids and str(a.get("text") or "").strip():
+            out[str(a["id"])] = str(a["text"]).strip()
+    return out
+
+
+def _single(task: Dict, temperature: float) -> str:
+    return ask_llm(task["system"], task["user"], temperature=temperature, static=task.get("static", ""))
+
+
+def _relay(src: Future, dst: Future) -> None:
+    error = src.exception()
+    if error is not None:
+        dst.set_exception(error)
+    else:
+        dst.set_result(src.result())
+
+
+# -----------------------------
+# 묶음 큐: 여러 세션에서 동시에 들어온 요청을 max_wait 동안 모아 한 번에
+# (하나만 모이면 그냥 단건 호출)
+# -----------------------------
+class LLMBatcher:
+    def __init__(self, max_batch: int = MAX_BATCH, max_wait: float = MAX_WAIT, temperature: float = 0.9):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.temperature = temperature
+        self._pending: List[Tuple[Dict, contextvars.Context, Future]] = []
+        self._cond = threading.Condition()
+        self._seq = 0
+        self._thread: Optional[threading.Thread] = None
+        self._pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="llm-batch")
+        self.batches = 0
+        self.requests = 0
+
+    def submit(self, role: str, system: str, static: str, user: str) -> Future:
+        fut: Future = Future()
+        with self._cond:
+            self._seq += 1
+            task = {"id": str(self._seq), "role": role, "system": system, "static": static, "user": user}
+            # 호출한 쪽의 trace 문맥(턴/봇 라벨)을 같이 넘김 - 묶음 스레드에서 그 문맥으로 실행
+            self._pending.append((task, contextvars.copy_context(), fut))
+            self.requests += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, daemon=True, name="llm-batcher")
+                self._thread.start()
+            self._cond.notify()
+        return fut
+
+    def generate(self, role: str, system: str, static: str, user: str) -> str:
+        return self.submit(role, system, static, user).result()
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                # 첫 요청이 들어온 뒤 max_wait까지 (또는 max_batch가 찰 때까지) 모음
+                deadline = time.monotonic() + self.max_wait
+                while len(self._pending) < self.max_batch:
+                    left = deadline - time.monotonic()
+                    if left <= 0:
+                        break
+                    self._cond.wait(left)
+                batch = self._pending[:self.max_batch]
+                del self._pending[:self.max_batch]
+                self.batches += 1
+            # 호출은 따로 (그동안 다음 묶음을 모음)
+            self._pool.submit(self._run, batch)
+
+    def _run(self, batch: List[Tuple[Dict, contextvars.Context, Future]]) -> None:
+        tasks = [t for t, _, _ in batch]
+        try:
+            # 묶음 호출은 첫 요청의 문맥에서 (trace/의도 라벨 유지)
+            out = batch[0][1].run(generate_many, tasks, self.temperature) if len(tasks) > 1 else {}
+        except Exception:
+            out = {}
+        for task, ctx, fut in batch:
+            text = out.get(task["id"])
+            if text is not None:
+                fut.set_result(text)
+                continue
+            # 묶음 응답에서 빠진 건 단건으로 다시 - 각자 문맥에서, 동시에 (기다리지 않고 결과만 넘김)
+            single = self._pool.submit(ctx.run, _single, task, self.temperature)
+            single.add_done_callback(lambda f, fut=fut: _relay(f, fut))
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "avg_batch": round(self.requests / self.batches, 2) if self.batches else 0.0,
+        }
+
+
+_batcher: Optional[LLMBatcher] = None
+_batcher_lock = threading.Lock()
+
+
+def default_batcher() -> LLMBatcher:
+    global _batcher
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                _batcher = LLMBatcher()
+    return _batcher
@@ -0,0 +1,155 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from utils.kobis import check
+
+# 하루 몇 번 확인할지 (초) - 새 집계가 아직 없으면 다음 확인 때 다시 시도
+CHECK_INTERVAL = 60 * 60
+RETRY_AFTER = 5 * 60
+HISTORY_DAYS = int(os.getenv("BOXOFFICE_HISTORY_DAYS", "7"))
+
+
+def _day(offset: int) -> str:
+    return (datetime.now() - timedelta(days=offset)).strftime("%Y%m%d")
+
+
+def _compact(items: List[Dict]) -> List[Dict]:
+    # 순위표에서 필요한 필드만
+    return [
+        {"rank": int(x.get("rank") or 0), "movieNm": x["movieNm"], "movieCd": x.get("movieCd"), "audiAcc": int(x.get("audiAcc") or 0)}
+        for x in items
+        if x.get("movieNm")
+    ]
+
+
+# -----------------------------
+# 박스오피스 씨드 서비스
+# 하루 한 번 일간/주간(+ N일 히스토리)을 받아두고, 턴에서는 메모리에서만 꺼내 씀
+# -----------------------------
+class BoxofficeService:
+    def __init__(self, kobis, history_days: int = HISTORY_DAYS, snapshot_path: Optional[str] = None):
+        self.kobis = kobis
+        self.history_days = history_days
+        self.snapshot_path = snapshot_path or os.getenv("BOXOFFICE_SNAPSHOT_PATH")
+        self._snapshot: Dict = {"day": None, "daily": [], "weekly": [], "history": {}}
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._ready = threading.Event()
+        self._last_attempt = 0.0
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._load()
+
+    # --- 조회 (네트워크 없음) ---
+    def daily_titles(self, n: int = 10) -> List[str]:
+        self._ensure_fresh()
+        return [x["movieNm"] for x in self._snapshot["daily"][:n]]
+
+    def weekly_titles(self, n: int = 10) -> List[str]:
+        self._ensure_fresh()
+        weekly = self._snapshot["weekly"] or self._snapshot["daily"]
+        return [x["movieNm"] for x in weekly[:n]]
+
+    def trending_titles(self, days: Optional[int] = None, n: int = 10) -> List[str]:
+        # 최근 N일 동안 최고 순위 기준으로 합침
+        self._ensure_fresh()
+        days = days or self.history_days
+        best: Dict[str, int] = {}
+        for d in sorted(self._snapshot["history"], reverse=True)[:days]:
+            for x in self._snapshot["history"][d]:
+                best[x["movieNm"]] = min(best.get(x["movieNm"], 99), x["rank"])
+        return [t for t, _ in sorted(best.items(), key=lambda kv: kv[1])][:n]
+
+    def is_fresh(self) -> bool:
+        return self._snapshot["day"] == _day(1) and bool(self._snapshot["daily"])
+
+    # --- 갱신 ---
+    def refresh(self) -> None:
+        daily = self._fetch_daily(_day(1))
+        # 주간 집계는 주가 끝나야 나오므로 일주일 전 기준
+        data = self.kobis.weekly_boxoffice(targetDt=_day(7), weekGb="0", itemPerPage=10)
+        weekly = _compact(data.get("boxOfficeResult", {}).get("weeklyBoxOfficeList", []) or [])
+
+        history = dict(self._snapshot["history"])
+        history[_day(1)] = daily
+        for offset in range(2, self.history_days + 1):
+            day = _day(offset)
+            if day not in history:
+                # 실패한 날(에러 응답/한도)은 빼 둠 → 다음 갱신 때 다시 받음
+                try:
+                    history[day] = self._fetch_daily(day)
+                except Exception:
+                    continue
+        keep = {_day(o) for o in range(1, self.history_days + 1)}
+        history = {d: v for d, v in history.items() if d in keep}
+
+        with self._lock:
+            self._snapshot = {"day": _day(1), "daily": daily, "weekly": weekly, "history": history}
+        self._save()
+
+    def _fetch_daily(self, day: str) -> List[Dict]:
+        # 에러 응답(faultInfo/한도)은 KobisError - 빈 순위표로 저장되지 않게
+        data = check(self.kobis.daily_boxoffice(targetDt=day, itemPerPage=10), "boxOfficeResult")
+        return _compact(data.get("boxOfficeResult", {}).get("dailyBoxOfficeList", []) or [])
+
+    def _ensure_fresh(self) -> None:
+        if self.is_fresh():
+            return
+        # 백그라운드 갱신 중이면 그걸 기다림 (처음 한 번, 스냅샷이 비어 있을 때만)
+        if self._thread and self._thread.is_alive():
+            if not self._snapshot["daily"]:
+                self._ready.wait(timeout=10)
+            return
+        # 백그라운드가 없으면 동기로 한 번 (실패하면 RETRY_AFTER 동안 재시도 안 함)
+        with self._refresh_lock:
+            if self.is_fresh() or time.time() - self._last_attempt < RETRY_AFTER:
+                return
+            self._try_refresh()
+
+    def _try_refresh(self) -> None:
+        self._last_attempt = time.time()
+        try:
+            self.refresh()
+        except Exception:
+            pass
+        finally:
+            self._ready.set()
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="boxoffice")
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            if not self.is_fresh():
+                with self._refresh_lock:
+                    self._try_refresh()
+            self._stop.wait(CHECK_INTERVAL)
+
+    # --- 스냅샷 파일 (재시작해도 그날 데이터는 다시 받지 않음) ---
+    def _save(self) -> None:
+        if not self.snapshot_path:
+            return
+        tmp = self.snapshot_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._snapshot, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, self.snapshot_path)
+
+    def _load(self) -> None:
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return
+        try:
+            with open(self.snapshot_path, encoding="utf-8") as f:
+                self._snapshot = json.load(f)
+        except Exception:
+            pass
@@ -0,0 +1,152 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# sqlite 캐시의 LRU 사용 시각을 다시 쓰는 최소 간격 (초)
+TOUCH_INTERVAL = 10 * 60
+
+
+# -----------------------------
+# 캐시 공통 (TTL + hit/miss 카운터)
+# -----------------------------
+class ResponseCache:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self._get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        if value is None or ttl <= 0:
+            return
+        self._set(key, value, time.time() + ttl)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+    def _get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def _set(self, key: str, value: Any, expires: float) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+# -----------------------------
+# 메모리 LRU
+# -----------------------------
+class MemoryCache(ResponseCache):
+    def __init__(self, max_entries: int = 2048):
+        super().__init__()
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def _get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def _set(self, key: str, value: Any, expires: float) -> None:
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# -----------------------------
+# 디스크 (sqlite) - 프로세스 재시작/여러 워커 간 공유
+# -----------------------------
+class SqliteCache(ResponseCache):
+    def __init__(self, path: str, max_entries: int = 50000):
+        super().__init__()
+        self.path = path
+        self.max_entries = max_entries
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL, used REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS cache_used ON cache(used)")
+            self._conn.commit()
+
+    def _get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires, used FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            # LRU 시각은 가끔만 갱신 (읽을 때마다 쓰면 hit도 직렬화된 디스크 쓰기가 됨)
+            if now - row[2] > TOUCH_INTERVAL:
+                self._conn.execute("UPDATE cache SET used = ? WHERE key = ?", (now, key))
+                self._conn.commit()
+        return json.loads(row[0])
+
+    def _set(self, key: str, value: Any, expires: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires, used) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), expires, time.time()),
+            )
+            # 오래 안 쓴 항목부터 정리 (LRU)
+            count = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY used LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
+
+
+def make_key(path: str, params: Dict[str, Any]) -> str:
+    # 빈 값은 빼고, 값은 문자열로 통일 + 키 정렬 → 같은 질의는 같은 키
+    normalized = {
+        k: str(v).strip()
+        for k, v in params.items()
+        if v is not None and str(v).strip() != ""
+    }
+    return path + "?" + json.dumps(normalized, sort_keys=True, ensure_ascii=False)
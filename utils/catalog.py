@@ -0,0 +1,197 @@
+import argparse
+import gzip
+import json
+import os
+import re
+import unicodedata
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+# -----------------------------
+# 로컬 KOBIS 카탈로그 (오프라인 수집 → 메모리 인덱스)
+# -----------------------------
+MOVIE_FIELDS = ("movieCd", "movieNm", "movieNmEn", "openDt", "prdtYear", "genreAlt", "nationAlt")
+PEOPLE_FIELDS = ("peopleCd", "peopleNm", "peopleNmEn", "repRoleNm", "filmoNames")
+
+
+def norm(text: str) -> str:
+    # 검색용 정규화: NFC + 소문자 + 공백/문장부호 제거
+    t = unicodedata.normalize("NFC", text or "").lower()
+    return re.sub(r"[^\w]+", "", t)
+
+
+def _grams(text: str) -> Set[str]:
+    if len(text) < 2:
+        return {text} if text else set()
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+class Catalog:
+    def __init__(self, movies: List[Dict], people: List[Dict], built: str = ""):
+        self.movies = movies
+        self.people = people
+        self.built = built
+
+        # 제목: 정규화 제목 → id, bigram → id 집합
+        self._title_exact: Dict[str, List[int]] = defaultdict(list)
+        self._title_grams: Dict[str, Set[int]] = defaultdict(set)
+        self._title_norm: List[str] = []
+        # 감독 이름 → 영화 id
+        self._by_director: Dict[str, List[int]] = defaultdict(list)
+        # 인물 이름 → 인물 id, 인물 코드 → 인물 id / 필모
+        self._people_by_name: Dict[str, List[int]] = defaultdict(list)
+        self._people_by_cd: Dict[str, int] = {}
+        self.filmography: Dict[str, List[str]] = {}
+
+        for i, m in enumerate(movies):
+            keys = [norm(m.get("movieNm", "")), norm(m.get("movieNmEn", ""))]
+            self._title_norm.append("|".join(keys))
+            for k in keys:
+                if not k:
+                    continue
+                self._title_exact[k].append(i)
+                for g in _grams(k):
+                    self._title_grams[g].add(i)
+            for d in m.get("directors") or []:
+                self._by_director[norm(d)].append(i)
+
+        for i, p in enumerate(people):
+            self._people_by_name[norm(p.get("peopleNm", ""))].append(i)
+            if p.get("peopleCd"):
+                self._people_by_cd[p["peopleCd"]] = i
+            filmo = [f for f in (p.get("filmoNames") or "").split("|") if f]
+            self.filmography[p.get("peopleCd", "")] = filmo
+
+    # --- 조회 ---
+    def search_movies(self, movieNm: str = "", directorNm: str = "", limit: int = 10) -> List[Dict]:
+        ids: Optional[Set[int]] = None
+
+        q = norm(movieNm)
+        if q:
+            # bigram 교집합으로 후보를 줄인 뒤 부분 문자열 확인 (KOBIS의 "포함" 검색과 같은 의미)
+            for g in _grams(q):
+                hit = self._title_grams.get(g, set())
+                ids = set(hit) if ids is None else ids & hit
+                if not ids:
+                    return []
+            ids = {i for i in ids or set() if q in self._title_norm[i]}
+
+        d = norm(directorNm)
+        if d:
+            by_dir = set(self._by_director.get(d, []))
+            ids = by_dir if ids is None else ids & by_dir
+
+        if not ids:
+            return []
+
+        exact = set(self._title_exact.get(q, [])) if q else set()
+        ranked = sorted(ids, key=lambda i: (i not in exact, -int(self.movies[i].get("openDt") or 0)))
+        return [self.movie_item(i) for i in ranked[:limit]]
+
+    def search_people(self, peopleNm: str, limit: int = 10) -> List[Dict]:
+        ids = self._people_by_name.get(norm(peopleNm), [])
+        return [dict(self.people[i]) for i in ids[:limit]]
+
+    def people_info(self, peopleCd: str) -> Optional[Dict]:
+        # KOBIS searchPeopleInfo 응답의 peopleInfo 모양으로 복원 (필모는 목록 API의 filmoNames)
+        # 참여 형태: 카탈로그 영화의 감독 목록에 있으면 "감독", 아니면 인물의 대표 역할
+        i = self._people_by_cd.get(peopleCd)
+        if i is None:
+            return None
+        p = self.people[i]
+        name = norm(p.get("peopleNm", ""))
+        filmos = []
+        for title in self.filmography.get(peopleCd, []):
+            ids = self._title_exact.get(norm(title), [])
+            directed = next((j for j in ids if name in (norm(d) for d in self.movies[j].get("directors") or [])), None)
+            movie = self.movies[directed if directed is not None else ids[0]] if ids else {}
+            filmos.append({
+                "movieCd": movie.get("movieCd"),
+                "movieNm": title,
+                "moviePartNm": "감독" if directed is not None else p.get("repRoleNm", ""),
+            })
+        return {"peopleCd": peopleCd, "peopleNm": p.get("peopleNm"), "repRoleNm": p.get("repRoleNm"), "filmos": filmos}
+
+    def movie_item(self, i: int) -> Dict:
+        # KOBIS searchMovieList 응답과 같은 모양으로 복원
+        m = dict(self.movies[i])
+        m["directors"] = [{"peopleNm": d} for d in m.get("directors") or []]
+        return m
+
+    # --- 저장/로드 ---
+    def save(self, path: str) -> None:
+        data = {"built": self.built, "movies": self.movies, "people": self.people}
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path: str) -> "Catalog":
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data.get("movies", []), data.get("people", []), data.get("built", ""))
+
+
+# -----------------------------
+# 수집 (KOBIS 목록 API 페이지 순회)
+# -----------------------------
+def _compact_movie(m: Dict[str, Any]) -> Dict[str, Any]:
+    out = {k: m[k] for k in MOVIE_FIELDS if m.get(k)}
+    directors = [d.get("peopleNm") for d in (m.get("directors") or []) if d.get("peopleNm")]
+    if directors:
+        out["directors"] = directors
+    return out
+
+
+def _compact_person(p: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: p[k] for k in PEOPLE_FIELDS if p.get(k)}
+
+
+def ingest(kobis, max_pages: int = 100, item_per_page: int = 100, **movie_filters) -> Catalog:
+    movies: List[Dict] = []
+    for page in range(1, max_pages + 1):
+        data = kobis.search_movie_list(curPage=page, itemPerPage=item_per_page, **movie_filters)
+        items = data.get("movieListResult", {}).get("movieList", []) or []
+        movies.extend(_compact_movie(m) for m in items)
+        if len(items) < item_per_page:
+            break
+
+    people: List[Dict] = []
+    for page in range(1, max_pages + 1):
+        data = kobis.search_people_list(peopleNm="", curPage=page, itemPerPage=item_per_page)
+        items = data.get("peopleListResult", {}).get("peopleList", []) or []
+        people.extend(_compact_person(p) for p in items)
+        if len(items) < item_per_page:
+            break
+
+    return Catalog(movies, people, built=datetime.now().strftime("%Y%m%d"))
+
+
+_default_catalog: Optional[Catalog] = None
+
+
+def default_catalog() -> Optional[Catalog]:
+    # KOBIS_CATALOG_PATH 스냅샷이 있으면 한 번만 로드해서 공유
+    global _default_catalog
+    path = os.getenv("KOBIS_CATALOG_PATH")
+    if _default_catalog is None and path and os.path.exists(path):
+        _default_catalog = Catalog.load(path)
+    return _default_catalog
+
+
+if __name__ == "__main__":
+    from utils.cache import MemoryCache
+    from utils.kobis import KobisClient
+
+    parser = argparse.ArgumentParser(description="KOBIS 영화/인물 목록을 로컬 카탈로그로 저장")
+    parser.add_argument("out", help="저장 경로 (예: catalog.json.gz)")
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--per-page", type=int, default=100)
+    parser.add_argument("--open-start-year", default="")
+    args = parser.parse_args()
+
+    # 수집 중에는 응답 캐시를 채우지 않음
+    client = KobisClient(cache=MemoryCache(max_entries=1))
+    catalog = ingest(client, max_pages=args.pages, item_per_page=args.per_page, openStartDt=args.open_start_year)
+    catalog.save(args.out)
+    print(f"movies={len(catalog.movies)} people={len(catalog.people)} → {args.out}")
@@ -0,0 +1,105 @@
+import os
+import threading
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+# -----------------------------
+# 설정 (환경변수로 조절)
+# -----------------------------
+POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "20"))
+MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+BACKOFF = float(os.getenv("HTTP_BACKOFF", "0.5"))
+HOST_LIMIT = int(os.getenv("HTTP_HOST_LIMIT", "8"))
+
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+_session: Optional[requests.Session] = None
+_plain_session: Optional[requests.Session] = None  # 재시도 없는 세션 (호출마다 한도를 세는 쪽에서 직접 재시도)
+_host_limits: Dict[str, threading.BoundedSemaphore] = {}
+_lock = threading.Lock()
+
+
+def _build_session(retries: bool = True) -> requests.Session:
+    retry = Retry(
+        total=MAX_RETRIES if retries else 0,
+        backoff_factor=BACKOFF,  # 0.5 → 0.5s, 1s, 2s ...
+        status_forcelist=RETRY_STATUS,
+        allowed_methods=frozenset(["GET"]),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+
+    s = requests.Session()
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    return s
+
+
+def get_session(retries: bool = True) -> requests.Session:
+    # 프로세스 전체가 하나의 keep-alive 커넥션 풀을 공유
+    global _session, _plain_session
+    if not retries:
+        if _plain_session is None:
+            with _lock:
+                if _plain_session is None:
+                    _plain_session = _build_session(retries=False)
+        return _plain_session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def configure(
+    pool_size: Optional[int] = None,
+    max_retries: Optional[int] = None,
+    backoff: Optional[float] = None,
+    host_limit: Optional[int] = None,
+) -> None:
+    global POOL_SIZE, MAX_RETRIES, BACKOFF, HOST_LIMIT, _session, _plain_session
+    with _lock:
+        if pool_size is not None:
+            POOL_SIZE = pool_size
+        if max_retries is not None:
+            MAX_RETRIES = max_retries
+        if backoff is not None:
+            BACKOFF = backoff
+        if host_limit is not None:
+            HOST_LIMIT = host_limit
+            _host_limits.clear()
+        for sess in (_session, _plain_session):
+            if sess is not None:
+                sess.close()
+        _session = None
+        _plain_session = None
+
+
+def _host_limit(url: str) -> threading.BoundedSemaphore:
+    host = urlsplit(url).netloc
+    with _lock:
+        sem = _host_limits.get(host)
+        if sem is None:
+            sem = _host_limits[host] = threading.BoundedSemaphore(HOST_LIMIT)
+    return sem
+
+
+def get(url: str, params: Optional[Dict[str, Any]] = None, timeout: float = 10, retries: bool = True) -> requests.Response:
+    # 호스트별 동시 요청 수 제한 (KOBIS/TMDB에 한꺼번에 몰리지 않게)
+    # retries=False 면 한 번만 보냄 (429/5xx도 그대로 돌려줌 - retry_delay로 직접 재시도)
+    with _host_limit(url):
+        return get_session(retries).get(url, params=params, timeout=timeout)
+
+
+def retry_delay(attempt: int, response: Optional[requests.Response] = None) -> float:
+    # 어댑터 재시도와 같은 간격 (Retry-After가 있으면 그걸)
+    after = response.headers.get("Retry-After") if response is not None else None
+    if after and after.isdigit():
+        return float(after)
+    return BACKOFF * (2 ** attempt)
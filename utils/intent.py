@@ -1,27 +1,140 @@
-from typing import Dict, Tuple
+import json
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+RULES_PATH = os.getenv("INTENT_RULES_PATH") or os.path.join(os.path.dirname(__file__), "intent_rules.json")
+
+
+def _trie(words: List[str]) -> str:
+    # 공통 접두를 묶은 정규식 (감독|감상 → 감(?:독|상)) - 위치마다 글자 하나씩만 비교
+    root: Dict = {}
+    for w in words:
+        node = root
+        for ch in w.lower():
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node: Dict) -> str:
+        alts = [re.escape(ch) + emit(node[ch]) for ch in sorted(k for k in node if k)]
+        if not alts:
+            return ""
+        end = "" in node
+        if len(alts) == 1 and not end:
+            return alts[0]
+        # 더 긴 키워드를 먼저 시도 (greedy ?)
+        return "(?:" + "|".join(alts) + ")" + ("?" if end else "")
+
+    return emit(root)
+
+
+def _compile(keywords: List[str]) -> "re.Pattern":
+    first = "".join(sorted({re.escape(k[0].lower()) for k in keywords}))
+    # 첫 글자로 먼저 거르고, 그 위치에서 가장 긴 키워드를 lookahead로 (겹치는 매치도 다 잡힘)
+    return re.compile(f"(?=[{first}])(?=({_trie(keywords)}))", re.IGNORECASE)
+
+
+# -----------------------------
+# 규칙 테이블 → 정규식 하나로 컴파일
+# 위치마다 가장 긴 키워드를 잡고, 그 안에 든 짧은 키워드 태그는 미리 합쳐둠
+# 키워드가 늘어도 입력은 한 번만 훑고 위치당 비용도 거의 그대로
+# -----------------------------
+class IntentClassifier:
+    def __init__(self, rules: Dict):
+        self.criteria: List[Dict] = rules.get("criteria", [])
+        tags: Dict[str, set] = {}
+        self._order: Dict[Tuple, int] = {}
+
+        def add(keyword: str, tag: Tuple) -> None:
+            tags.setdefault(keyword, set()).add(tag)
+
+        for c in self.criteria:
+            for k in c["keywords"]:
+                add(k, ("criteria", c["name"]))
+        for mode, keywords in rules.get("mode", {}).items():
+            for k in keywords:
+                add(k, ("mode", mode))
+        for field, values in rules.get("constraints", {}).items():
+            for value, keywords in values.items():
+                self._order[("constraint", field, value)] = len(self._order)
+                for k in keywords:
+                    add(k, ("constraint", field, value))
+
+        # 키워드 안에 든 다른 키워드의 태그까지 (추천해 → 추천)
+        keywords = sorted(tags, key=len, reverse=True)
+        self._tags = {
+            k.lower(): tuple(frozenset().union(*(tags[s] for s in keywords if s in k)))
+            for k in keywords
+        }
+        self._pattern = _compile(keywords) if keywords else None
+
+    @classmethod
+    def load(cls, path: str = RULES_PATH) -> "IntentClassifier":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def scan(self, text: str) -> Dict[Tuple, int]:
+        # 태그 → 처음 나온 위치
+        first: Dict[Tuple, int] = {}
+        if not self._pattern:
+            return first
+        tags = self._tags
+        for m in self._pattern.finditer(text):
+            for tag in tags[m.group(1).lower()]:
+                if tag not in first:
+                    first[tag] = m.start()
+        return first
+
+    def classify(self, text: str) -> Dict:
+        t = (text or "").strip()
+        found = self.scan(t)
+
+        # 기준: 테이블 순서가 우선순위 (감독 > 배우 > 박스오피스)
+        criteria: Optional[str] = None
+        value: Optional[str] = None
+        for c in self.criteria:
+            pos = found.get(("criteria", c["name"]))
+            if pos is None:
+                continue
+            criteria = c["name"]
+            if c.get("capture") == "before":
+                value = t[:pos].strip()
+            break
+
+        # 말하는 방식: 추천 키워드가 하나라도 있으면 추천, 큐레이션 키워드만 있으면 큐레이션
+        mode = "RECOMMEND"
+        if ("mode", "CURATE") in found and ("mode", "RECOMMEND") not in found:
+            mode = "CURATE"
+
+        # 같은 필드에 여러 값이 걸리면 테이블 뒤쪽 값이 이김 (기존 if 순서와 동일)
+        constraints: Dict = {}
+        hits = [x for x in found if x[0] == "constraint"]
+        for tag in sorted(hits, key=self._order.__getitem__) if len(hits) > 1 else hits:
+            constraints[tag[1]] = tag[2]
+
+        return {
+            "type": "recommend" if criteria else "curation",
+            "criteria": criteria,
+            "value": value,
+            "mode": mode,
+            "constraints": constraints,
+        }
+
+
+_classifier: Optional[IntentClassifier] = None
+
+
+def default_classifier() -> IntentClassifier:
+    global _classifier
+    if _classifier is None:
+        _classifier = IntentClassifier.load()
+    return _classifier
+
+
+def classify(text: str) -> Dict:
+    return default_classifier().classify(text)
+
 
 def parse_intent_and_constraints(text: str) -> Tuple[str, Dict]:
-    t = (text or "").strip()
-    lower = t.lower()
-
-    # intent
-    # curation: 소개/분석/해석/설명/어때/볼까말까/결말스포X 등
-    curation_keywords = ["소개", "분석", "해석", "설명", "어때", "볼까", "볼지", "큐레이션", "리뷰", "평"]
-    recommend_keywords = ["추천", "비슷한", "같은", "골라", "뭐 볼", "뭐볼", "추천해", "추천좀"]
-
-    intent = "RECOMMEND"
-    if any(k in t for k in curation_keywords) and not any(k in t for k in recommend_keywords):
-        intent = "CURATE"
-    if any(k in t for k in recommend_keywords):
-        intent = "RECOMMEND"
-
-    constraints: Dict = {}
-    # 간단한 제약 추출(확장 가능)
-    if "크리스마스" in t:
-        constraints["mood"] = "christmas"
-    if "로맨스" in t or "멜로" in t:
-        constraints["genre"] = "romance"
-    if "공포" in t or "호러" in t:
-        constraints["genre"] = "horror"
-
-    return intent, constraints
+    result = classify(text)
+    return result["mode"], result["constraints"]
@@ -1,15 +1,59 @@
+import asyncio
+import contextvars
 import os
+import threading
+import time
 import requests
 import streamlit as st
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Any, Dict, List, Optional
 from dotenv import load_dotenv
 
+from utils import http, trace
+from utils.cache import MemoryCache, ResponseCache, SqliteCache, make_key
+from utils.catalog import Catalog, default_catalog
+from utils.quota import HIGH, KobisLimiter, QuotaExceeded, default_limiter, priority
+from utils.titles import TitleMatcher, default_matcher, title_variants
+
 load_dotenv()
 
 BASE = "https://www.kobis.or.kr/kobisopenapi/webservice/rest"
 
+DAY = 60 * 60 * 24
+
+# 엔드포인트별 캐시 TTL (초) - 박스오피스는 하루, 상세 정보는 몇 주
+CACHE_TTL = {
+    "boxoffice/searchDailyBoxOfficeList.json": DAY,
+    "boxoffice/searchWeeklyBoxOfficeList.json": DAY,
+    "movie/searchMovieList.json": 7 * DAY,
+    "movie/searchMovieInfo.json": 28 * DAY,
+    "people/searchPeopleList.json": 7 * DAY,
+    "people/searchPeopleInfo.json": 28 * DAY,
+}
+
+_default_cache: Optional[ResponseCache] = None
+
+
+def default_cache() -> ResponseCache:
+    # 프로세스 전체가 공유하는 캐시 (KOBIS_CACHE_PATH 있으면 sqlite)
+    global _default_cache
+    if _default_cache is None:
+        path = os.getenv("KOBIS_CACHE_PATH")
+        _default_cache = SqliteCache(path) if path else MemoryCache()
+    return _default_cache
+
+
 class KobisClient:
-    def __init__(self, api_key: Optional[str] = None, timeout: int = 10):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        timeout: int = 10,
+        cache: Optional[ResponseCache] = None,
+        catalog: Optional[Catalog] = None,
+        matcher: Optional[TitleMatcher] = None,
+        limiter: Optional[KobisLimiter] = None,
+    ):
         # 1. 우선순위: 직접 입력받은 키
         self.api_key = api_key
         
@@ -25,15 +69,64 @@ class KobisClient:
             pass
             
         self.timeout = timeout
+        self.cache = cache if cache is not None else default_cache()
+        # 로컬 카탈로그가 있으면 목록 검색은 인덱스에서 먼저 찾고, 없을 때만 네트워크
+        self.catalog = catalog if catalog is not None else default_catalog()
+        # LLM이 낸 제목 ↔ KOBIS 제목 매칭 (정규화 + 자모 유사도, 결과 캐시)
+        self.matcher = matcher or default_matcher()
+        # 키 단위 속도/일일 한도 (우선순위 낮은 호출부터 캐시 전용으로)
+        self.limiter = limiter or default_limiter()
+        # 엔드포인트별 hit/miss
+        self.stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"hit": 0, "miss": 0})
 
     def _get(self, path: str, params: Dict[str, Any]) -> Dict[str, Any]:
         if not self.api_key:
             return {"_error": "KOBIS_API_KEY is missing"}
+
+        with trace.span("kobis", path=path) as sp:
+            key = make_key(path, params)
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.stats[path]["hit"] += 1
+                sp.set(cache="hit")
+                return cached
+            self.stats[path]["miss"] += 1
+            sp.set(cache="miss")
+
+            r = self._send(path, params, sp)
+            r.raise_for_status()
+            sp.set(bytes=len(r.content), status=r.status_code)
+            data = r.json()
+
+            # 에러 응답(faultInfo)은 캐시하지 않음
+            if "faultInfo" not in data:
+                self.cache.set(key, data, CACHE_TTL.get(path, DAY))
+            return data
+
+    def _send(self, path: str, params: Dict[str, Any], sp: trace.Span) -> requests.Response:
+        # 캐시에 없는 것만 한도를 씀 - 재시도도 실제 요청이라 시도마다 한도를 받음
+        # (어댑터 재시도를 쓰면 한 번으로 세고 최대 네 번 나감)
+        # 한도가 안 되면 QuotaExceeded (응답/빈 결과를 캐시하지 않게)
         url = f"{BASE}/{path}"
-        params = {"key": self.api_key, **params}
-        r = requests.get(url, params=params, timeout=self.timeout)
-        r.raise_for_status()
-        return r.json()
+        attempt = 0
+        while True:
+            try:
+                self.limiter.acquire()
+            except QuotaExceeded:
+                sp.set(quota="denied")
+                raise
+            last = attempt >= http.MAX_RETRIES
+            try:
+                r = http.get(url, params={"key": self.api_key, **params}, timeout=self.timeout, retries=False)
+            except (requests.ConnectionError, requests.Timeout):
+                if last:
+                    raise
+                r = None
+            if r is not None and (r.status_code not in http.RETRY_STATUS or last):
+                sp.set(attempts=attempt + 1)
+                return r
+            time.sleep(http.retry_delay(attempt, r))
+            attempt += 1
 
     # --- Boxoffice ---
     def daily_boxoffice(self, targetDt: str, itemPerPage: int = 10, **kwargs) -> Dict[str, Any]:
@@ -44,6 +137,9 @@ class KobisClient:
 
     # --- Movie ---
     def search_movie_list(self, movieNm: str = "", directorNm: str = "", curPage: int = 1, itemPerPage: int = 10, **kwargs) -> Dict[str, Any]:
+        local = self._catalog_movies(movieNm, directorNm, curPage, itemPerPage, kwargs)
+        if local:
+            return local
         return self._get("movie/searchMovieList.json", {"movieNm": movieNm, "directorNm": directorNm, "curPage": curPage, "itemPerPage": itemPerPage, **kwargs})
 
     def search_movie_info(self, movieCd: str) -> Dict[str, Any]:
@@ -51,34 +147,170 @@ class KobisClient:
 
     # --- People ---
     def search_people_list(self, peopleNm: str, curPage: int = 1, itemPerPage: int = 10, **kwargs) -> Dict[str, Any]:
+        local = self._catalog_people(peopleNm, curPage, itemPerPage, kwargs)
+        if local:
+            return local
         return self._get("people/searchPeopleList.json", {"peopleNm": peopleNm, "curPage": curPage, "itemPerPage": itemPerPage, **kwargs})
 
     def search_people_info(self, peopleCd: str) -> Dict[str, Any]:
+        local = self._catalog_people_info(peopleCd)
+        if local:
+            return local
         return self._get("people/searchPeopleInfo.json", {"peopleCd": peopleCd})
 
+    # --- 로컬 카탈로그 (첫 페이지 + 추가 필터 없을 때만) ---
+    def _catalog_movies(self, movieNm: str, directorNm: str, curPage: int, itemPerPage: int, extra: Dict) -> Optional[Dict[str, Any]]:
+        if not self.catalog or not (movieNm or directorNm) or curPage != 1 or extra:
+            return None
+        found = self.catalog.search_movies(movieNm=movieNm, directorNm=directorNm, limit=itemPerPage)
+        if not found:
+            return None
+        return {"movieListResult": {"totCnt": len(found), "source": "catalog", "movieList": found}}
+
+    def _catalog_people(self, peopleNm: str, curPage: int, itemPerPage: int, extra: Dict) -> Optional[Dict[str, Any]]:
+        if not self.catalog or not peopleNm or curPage != 1 or extra:
+            return None
+        found = self.catalog.search_people(peopleNm, limit=itemPerPage)
+        if not found:
+            return None
+        return {"peopleListResult": {"totCnt": len(found), "source": "catalog", "peopleList": found}}
+
+    def _catalog_people_info(self, peopleCd: str) -> Optional[Dict[str, Any]]:
+        # 카탈로그에 필모가 있는 인물만 (없으면 네트워크)
+        info = self.catalog.people_info(peopleCd) if self.catalog else None
+        if not info or not info["filmos"]:
+            return None
+        return {"peopleInfoResult": {"source": "catalog", "peopleInfo": info}}
+
     # --- Convenience ---
     def verify_titles(self, titles: List[str]) -> Dict[str, Any]:
+        # 검증은 한도가 빠듯해도 마지막까지 호출 (힌트/후보 조회가 먼저 캐시 전용이 됨)
+        with priority(HIGH):
+            return self._verify_titles(titles)
+
+    def _verify_titles(self, titles: List[str]) -> Dict[str, Any]:
         out: Dict[str, Any] = {}
         for t in titles:
             t = (t or "").strip()
             if not t:
                 continue
+            cached = self.matcher.lookup(t)
+            if cached is not None:
+                out[t] = cached
+                continue
             try:
-                data = self.search_movie_list(movieNm=t, itemPerPage=5)
-                movies = data.get("movieListResult", {}).get("movieList", []) or []
-                if not movies:
-                    out[t] = {"found": False}
-                    continue
-                m = movies[0]
-                out[t] = {
-                    "found": True,
-                    "movieCd": m.get("movieCd"),
-                    "movieNm": m.get("movieNm"),
-                    "openDt": m.get("openDt"),
-                    "genreAlt": m.get("genreAlt"),
-                    "nationAlt": m.get("nationAlt"),
-                    "directors": [d.get("peopleNm") for d in (m.get("directors") or []) if d.get("peopleNm")],
-                }
+                # 원제로 못 찾으면 괄호/부제를 뗀 제목으로 다시 검색
+                movies: List[Dict[str, Any]] = []
+                for q in title_variants(t):
+                    movies = _movie_list(self.search_movie_list(movieNm=q, itemPerPage=10))
+                    if movies:
+                        break
+                out[t] = self.matcher.match(t, movies)
+                self.matcher.remember(t, out[t])
             except Exception as e:
                 out[t] = {"found": False, "error": str(e)}
-        return out
\ No newline at end of file
+        return out
+
+
+class KobisError(RuntimeError):
+    pass
+
+
+def check(data: Dict[str, Any], result: str) -> Dict[str, Any]:
+    # 에러 응답(faultInfo / 키 없음)은 예외로 - "결과 없음"으로 보고 캐시하는 일이 없게
+    if result not in data:
+        fault = data.get("faultInfo") or {}
+        raise KobisError(fault.get("message") or data.get("_error") or f"KOBIS response has no {result}")
+    return data
+
+
+def _movie_list(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return check(data, "movieListResult")["movieListResult"].get("movieList", []) or []
+
+
+# -----------------------------
+# asyncio 버전 (KobisClient와 같은 API)
+# -----------------------------
+class AsyncKobisClient:
+    def __init__(self, kobis: Optional[KobisClient] = None, concurrency: int = 8):
+        # 전송/캐시는 동기 클라이언트 것을 그대로 재사용
+        self.kobis = kobis or KobisClient()
+        self.concurrency = concurrency
+        self._pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="kobis")
+        # 진행 중인 동일 요청 공유 (이벤트 루프/스레드가 달라도 한 번만 호출)
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.RLock()
+
+    async def _get(self, path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        key = make_key(path, params)
+        with self._lock:
+            fut = self._inflight.get(key)
+            if fut is None:
+                # 호출한 쪽의 trace 문맥(봇/의도 라벨)을 워커 스레드로 넘김
+                fut = self._pool.submit(contextvars.copy_context().run, self.kobis._get, path, params)
+                self._inflight[key] = fut
+                fut.add_done_callback(lambda _: self._forget(key))
+        return await asyncio.wrap_future(fut)
+
+    def _forget(self, key: str) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    # --- Boxoffice ---
+    async def daily_boxoffice(self, targetDt: str, itemPerPage: int = 10, **kwargs) -> Dict[str, Any]:
+        return await self._get("boxoffice/searchDailyBoxOfficeList.json", {"targetDt": targetDt, "itemPerPage": itemPerPage, **kwargs})
+
+    async def weekly_boxoffice(self, targetDt: str, weekGb: str = "0", itemPerPage: int = 10, **kwargs) -> Dict[str, Any]:
+        return await self._get("boxoffice/searchWeeklyBoxOfficeList.json", {"targetDt": targetDt, "weekGb": weekGb, "itemPerPage": itemPerPage, **kwargs})
+
+    # --- Movie ---
+    async def search_movie_list(self, movieNm: str = "", directorNm: str = "", curPage: int = 1, itemPerPage: int = 10, **kwargs) -> Dict[str, Any]:
+        local = self.kobis._catalog_movies(movieNm, directorNm, curPage, itemPerPage, kwargs)
+        if local:
+            return local
+        return await self._get("movie/searchMovieList.json", {"movieNm": movieNm, "directorNm": directorNm, "curPage": curPage, "itemPerPage": itemPerPage, **kwargs})
+
+    async def search_movie_info(self, movieCd: str) -> Dict[str, Any]:
+        return await self._get("movie/searchMovieInfo.json", {"movieCd": movieCd})
+
+    # --- People ---
+    async def search_people_list(self, peopleNm: str, curPage: int = 1, itemPerPage: int = 10, **kwargs) -> Dict[str, Any]:
+        local = self.kobis._catalog_people(peopleNm, curPage, itemPerPage, kwargs)
+        if local:
+            return local
+        return await self._get("people/searchPeopleList.json", {"peopleNm": peopleNm, "curPage": curPage, "itemPerPage": itemPerPage, **kwargs})
+
+    async def search_people_info(self, peopleCd: str) -> Dict[str, Any]:
+        local = self.kobis._catalog_people_info(peopleCd)
+        if local:
+            return local
+        return await self._get("people/searchPeopleInfo.json", {"peopleCd": peopleCd})
+
+    # --- Convenience ---
+    async def verify_titles(self, titles: List[str]) -> Dict[str, Any]:
+        sem = asyncio.Semaphore(self.concurrency)
+
+        matcher = self.kobis.matcher
+
+        async def one(t: str) -> Dict[str, Any]:
+            cached = matcher.lookup(t)
+            if cached is not None:
+                return cached
+            async with sem:
+                try:
+                    movies: List[Dict[str, Any]] = []
+                    for q in title_variants(t):
+                        movies = _movie_list(await self.search_movie_list(movieNm=q, itemPerPage=10))
+                        if movies:
+                            break
+                except Exception as e:
+                    return {"found": False, "error": str(e)}
+            facts = matcher.match(t, movies)
+            matcher.remember(t, facts)
+            return facts
+
+        # 순서 유지 + 같은 제목은 한 번만
+        uniq = list(dict.fromkeys(t.strip() for t in titles if t and t.strip()))
+        with priority(HIGH):
+            results = await asyncio.gather(*(one(t) for t in uniq))
+        return dict(zip(uniq, results))
\ No newline at end of file
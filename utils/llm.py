@@ -1,8 +1,16 @@
+import hashlib
+import json
 import os
+import re
+import unicodedata
 import streamlit as st
+from typing import Dict, Iterator, List, Optional
 from dotenv import load_dotenv
 from openai import OpenAI
 
+from utils import trace
+from utils.cache import MemoryCache, ResponseCache, SqliteCache
+
 # ✅ .env 로드 (로컬 실행용)
 load_dotenv()
 
@@ -23,13 +31,155 @@ except:
 # 클라이언트 생성
 _client = OpenAI(api_key=api_key)
 
-def ask_llm(system: str, user: str, temperature: float = 0.9) -> str:
-    res = _client.chat.completions.create(
-        model=_MODEL,
-        messages=[
-            {"role": "system", "content": system},
-            {"role": "user", "content": user},
-        ],
-        temperature=temperature,
+# -----------------------------
+# 응답 캐시 (LLM_CACHE=off 로 끄기, LLM_CACHE_PATH 있으면 sqlite)
+# -----------------------------
+CACHE_ENABLED = os.getenv("LLM_CACHE", "on").lower() not in ("off", "0", "false")
+CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(60 * 60 * 24)))
+
+_cache_path = os.getenv("LLM_CACHE_PATH")
+_cache: ResponseCache = SqliteCache(_cache_path) if _cache_path else MemoryCache(max_entries=1024)
+
+
+def get_cache() -> ResponseCache:
+    return _cache
+
+
+def normalize_text(text: str) -> str:
+    # 공백/문장부호/반복 웃음 차이를 무시 → 거의 같은 요청은 같은 키
+    t = unicodedata.normalize("NFC", text or "").lower()
+    t = re.sub(r"[ㅋㅎㅠㅜ]+", "", t)
+    t = re.sub(r"[^\w]+", "", t)
+    return t
+
+
+def _cache_key(system: str, user: str, temperature: float, cache_key: Optional[str], static: str = "") -> str:
+    # (모델, 시스템, 고정 규칙, 유저 or 정규화 키, 온도 구간)
+    raw = json.dumps(
+        [_MODEL, system, static, cache_key if cache_key is not None else user, round(temperature, 1)],
+        ensure_ascii=False,
+    )
+    return "llm:" + hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# -----------------------------
+# 메시지 배치: 고정 접두(페르소나 → 작업 규칙) + 매번 바뀌는 유저 메시지
+# 접두가 바이트 단위로 같아야 OpenAI 프롬프트 캐시가 적중 (1024토큰 이상일 때)
+# -----------------------------
+PROMPT_CACHE_KEY = os.getenv("LLM_PROMPT_CACHE_KEY", "on").lower() not in ("off", "0", "false")
+
+
+def _messages(system: str, user: str, static: str) -> List[Dict[str, str]]:
+    messages = [{"role": "system", "content": system}]
+    if static:
+        messages.append({"role": "system", "content": static})
+    messages.append({"role": "user", "content": user})
+    return messages
+
+
+def _request_kwargs(system: str, static: str, json_mode: bool = False) -> Dict:
+    kwargs: Dict = {}
+    # 구조화 출력 (프롬프트에 JSON 형식 안내가 있어야 함)
+    if json_mode:
+        kwargs["response_format"] = {"type": "json_object"}
+    # 같은 접두를 가진 요청을 같은 캐시 서버로 보내도록 라우팅 힌트 (구버전 SDK도 받도록 extra_body)
+    if PROMPT_CACHE_KEY:
+        prefix = hashlib.sha256((system + "\x00" + static).encode("utf-8")).hexdigest()[:16]
+        kwargs["extra_body"] = {"prompt_cache_key": f"cinematalk:{prefix}"}
+    return kwargs
+
+
+def _record_usage(sp: trace.Span, usage) -> None:
+    # 토큰 사용량 (캐시된 프롬프트 토큰 포함) → span 속성
+    if usage is None:
+        return
+    details = getattr(usage, "prompt_tokens_details", None)
+    sp.set(
+        prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+        completion_tokens=getattr(usage, "completion_tokens", 0) or 0,
+        cached_tokens=(getattr(details, "cached_tokens", 0) or 0) if details else 0,
     )
-    return (res.choices[0].message.content or "").strip()
\ No newline at end of file
+
+
+def ask_llm(
+    system: str,
+    user: str,
+    temperature: float = 0.9,
+    use_cache: bool = True,
+    cache_key: Optional[str] = None,
+    static: str = "",
+    json_mode: bool = False,
+) -> str:
+    use_cache = use_cache and CACHE_ENABLED
+    with trace.span("llm", model=_MODEL) as sp:
+        if use_cache:
+            key = _cache_key(system, user, temperature, cache_key, static)
+            cached = _cache.get(key)
+            sp.set(cache="hit" if cached is not None else "miss")
+            if cached is not None:
+                return cached
+
+        res = _client.chat.completions.create(
+            model=_MODEL,
+            messages=_messages(system, user, static),
+            temperature=temperature,
+            **_request_kwargs(system, static, json_mode),
+        )
+        text = (res.choices[0].message.content or "").strip()
+        _record_usage(sp, getattr(res, "usage", None))
+        sp.set(bytes=len(text.encode("utf-8")))
+        if use_cache and text:
+            _cache.set(key, text, CACHE_TTL)
+        return text
+
+
+def ask_llm_stream(
+    system: str,
+    user: str,
+    temperature: float = 0.9,
+    use_cache: bool = True,
+    cache_key: Optional[str] = None,
+    static: str = "",
+) -> Iterator[str]:
+    use_cache = use_cache and CACHE_ENABLED
+    sp = trace.start_span("llm", model=_MODEL, stream=True)
+    if use_cache:
+        key = _cache_key(system, user, temperature, cache_key, static)
+        cached = _cache.get(key)
+        sp.set(cache="hit" if cached is not None else "miss")
+        if cached is not None:
+            sp.set(bytes=len(cached.encode("utf-8")))
+            sp.finish()
+            yield cached
+            return
+
+    # 토큰이 도착하는 대로 조각(delta)을 내보냄
+    chunks = []
+    try:
+        stream = _client.chat.completions.create(
+            model=_MODEL,
+            messages=_messages(system, user, static),
+            temperature=temperature,
+            stream=True,
+            stream_options={"include_usage": True},
+            **_request_kwargs(system, static),
+        )
+        for chunk in stream:
+            _record_usage(sp, getattr(chunk, "usage", None))
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                if not chunks:
+                    sp.set(ttft_ms=sp.elapsed_ms())
+                chunks.append(delta)
+                yield delta
+    except BaseException as e:
+        sp.finish(e)
+        raise
+
+    text = "".join(chunks).strip()
+    sp.set(bytes=len(text.encode("utf-8")))
+    sp.finish()
+    if use_cache and text:
+        _cache.set(key, text, CACHE_TTL)
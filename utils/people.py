@@ -0,0 +1,145 @@
+import threading
+from typing import Dict, List, Optional
+
+from utils.boxoffice import BoxofficeService
+from utils.cache import MemoryCache
+from utils.catalog import norm
+from utils.kobis import KobisError, check
+from utils.quota import QuotaExceeded
+
+DAY = 60 * 60 * 24
+PEOPLE_TTL = 7 * DAY
+FILMO_TTL = 28 * DAY
+
+# 역할별로 필모에서 인정하는 참여 형태
+ROLE_PARTS = {
+    "배우": ("배우", "주연", "조연", "출연"),
+    "감독": ("감독",),
+}
+# 맞는 참여작이 없으면 전체 필모로 대신하지 않는 역할
+STRICT_ROLES = ("감독",)
+
+
+# -----------------------------
+# 인물 해석: 이름 → peopleCd (역할로 동명이인 구분) → 랭킹된 필모
+# 한 번 해석한 인물은 메모리에서 바로 (인기 배우/감독 반복 조회는 네트워크 없음)
+# -----------------------------
+class PeopleResolver:
+    def __init__(self, kobis, boxoffice: Optional[BoxofficeService] = None):
+        self.kobis = kobis
+        self.boxoffice = boxoffice
+        self._people = MemoryCache(max_entries=2048)
+        self._filmo = MemoryCache(max_entries=2048)
+        # 같은 이름을 동시에 해석하면 한 번만 호출 (키 해시로 나눈 고정 개수 락)
+        self._stripes = [threading.Lock() for _ in range(64)]
+
+    def _lock(self, key: str) -> threading.Lock:
+        return self._stripes[hash(key) % len(self._stripes)]
+
+    # --- 이름 → 후보 인물 ---
+    def candidates(self, name: str) -> List[Dict]:
+        key = norm(name)
+        if not key:
+            return []
+        cached = self._people.get(key)
+        if cached is not None:
+            return cached
+        with self._lock("p:" + key):
+            cached = self._people.get(key)
+            if cached is not None:
+                return cached
+            # 에러 응답은 KobisError로 (빈 결과를 캐시하면 다음 턴에도 못 찾음)
+            data = check(self.kobis.search_people_list(peopleNm=name, itemPerPage=10), "peopleListResult")
+            plist = data["peopleListResult"].get("peopleList", []) or []
+            people = [p for p in plist if p.get("peopleCd")]
+            self._people.set(key, people, PEOPLE_TTL)
+            return people
+
+    def resolve(self, name: str, role: Optional[str] = None) -> Optional[Dict]:
+        people = self.candidates(name)
+        if not people:
+            return None
+        exact = norm(name)
+
+        def score(p: Dict) -> tuple:
+            return (
+                norm(p.get("peopleNm", "")) == exact,
+                role is not None and p.get("repRoleNm") == role,
+                len((p.get("filmoNames") or "").split("|")),
+            )
+
+        return max(people, key=score)
+
+    # --- 필모 (처음 해석할 때 랭킹까지 계산해 저장) ---
+    def filmography(self, people_cd: str, role: Optional[str] = None) -> List[Dict]:
+        key = f"{people_cd}:{role or ''}"
+        cached = self._filmo.get(key)
+        if cached is not None:
+            return cached
+        with self._lock("f:" + key):
+            cached = self._filmo.get(key)
+            if cached is not None:
+                return cached
+            info = check(self.kobis.search_people_info(people_cd), "peopleInfoResult")
+            filmos = info["peopleInfoResult"].get("peopleInfo", {}).get("filmos", []) or []
+            ranked = self._rank(filmos, role)
+            self._filmo.set(key, ranked, FILMO_TTL)
+            return ranked
+
+    def _rank(self, filmos: List[Dict], role: Optional[str]) -> List[Dict]:
+        parts = ROLE_PARTS.get(role or "", ())
+        hits = set(self.boxoffice.trending_titles(n=50)) if self.boxoffice else set()
+        catalog = getattr(self.kobis, "catalog", None)
+
+        rows = []
+        seen = set()
+        for f in filmos:
+            title = f.get("movieNm")
+            if not title or title in seen:
+                continue
+            seen.add(title)
+            year = 0
+            if catalog:
+                found = catalog.search_movies(movieNm=title, limit=1)
+                year = int((found[0].get("openDt") or "0")[:4] or 0) if found else 0
+            rows.append((f, title, year))
+
+        # 최근작: 한 가지 기준(순위)으로 - 카탈로그 개봉 연도 순, 같으면 KOBIS 필모 순서(최신순)
+        # 카탈로그에 없는 작품은 필모에서 바로 앞(더 최신) 작품의 연도를 물려받음 (앞이 없으면 처음 나오는 연도)
+        last = next((y for _, _, y in rows if y), 0)
+        years = []
+        for _, _, y in rows:
+            last = y or last
+            years.append(last)
+        order = sorted(range(len(rows)), key=lambda i: (-years[i], i))
+        n = max(len(rows), 1)
+        recency = {i: 1 - r / n for r, i in enumerate(order)}
+
+        out = []
+        for i, (f, title, _) in enumerate(rows):
+            part = f.get("moviePartNm") or ""
+            score = recency[i] + (1.0 if parts and any(p in part for p in parts) else 0.0) + (0.5 if title in hits else 0.0)
+            out.append({"movieCd": f.get("movieCd"), "movieNm": title, "part": part, "score": round(score, 3)})
+
+        # 역할이 정해졌으면 그 역할로 참여한 작품만
+        # 감독은 없으면 빈 목록 (출연작을 감독작으로 내지 않게 - 호출한 쪽이 directorNm 검색으로 넘어감)
+        # 배우는 없으면 전체 (필모의 참여 표기가 제각각이라)
+        if parts:
+            matched = [x for x in out if any(p in x["part"] for p in parts)]
+            out = matched if matched or role in STRICT_ROLES else out
+        out.sort(key=lambda x: -x["score"])
+        return out
+
+    def clear(self) -> None:
+        self._people.clear()
+        self._filmo.clear()
+
+    def ranked_titles(self, name: str, role: Optional[str] = None) -> List[str]:
+        # KOBIS 한도가 빠듯하거나 에러 응답이면 캐시에 없는 인물은 빈 목록 (턴은 계속, 다음 턴에 다시 시도)
+        try:
+            person = self.resolve(name, role)
+            if not person:
+                return []
+            return [f["movieNm"] for f in self.filmography(person["peopleCd"], role)]
+        except (QuotaExceeded, KobisError):
+            return []
@@ -0,0 +1,164 @@
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils.intent import RULES_PATH
+
+DAY = 60 * 60 * 24
+
+# -----------------------------
+# 설정 (RECO_POOLS=off 로 끄기 - 풀 파일이 없으면 원래대로 think)
+# -----------------------------
+ENABLED = os.getenv("RECO_POOLS", "on").lower() not in ("off", "0", "false")
+POOLS_PATH = os.getenv("RECO_POOLS_PATH") or os.path.join(tempfile.gettempdir(), "cinematalk_pools.json")
+POOL_SIZE = int(os.getenv("RECO_POOL_SIZE", "20"))  # 봇 x 조건마다 모아둘 제목 수
+MAX_AGE = float(os.getenv("RECO_POOL_MAX_AGE", str(14 * DAY)))  # 이보다 오래된 풀은 안 씀
+
+
+def pool_keys(constraints: Dict) -> List[str]:
+    # 조건이 여럿이면 묶은 키(빌드해 뒀다면)를 먼저, 없으면 조건 하나짜리 풀
+    singles = [f"{k}:{v}" for k, v in sorted(constraints.items())]
+    return (["|".join(singles)] if len(singles) > 1 else []) + singles
+
+
+# -----------------------------
+# 추천 풀: 봇(페르소나) x 조건(mood/genre)마다 KOBIS 검증까지 끝난 순위 목록
+# 오프라인 잡이 파일로 만들고, 턴에서는 메모리에서 안 쓴 제목만 꺼냄 (파일이 바뀌면 다시 읽음)
+# -----------------------------
+class RecommendationPools:
+    def __init__(self, path: str = POOLS_PATH, max_age: float = MAX_AGE):
+        self.path = path
+        self.max_age = max_age
+        self._data: Dict = {"built": 0, "pools": {}}
+        self._mtime: Optional[float] = None
+        self._lock = threading.Lock()
+        self.reload()
+
+    def reload(self) -> None:
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime == self._mtime:
+            return
+        with self._lock:
+            if mtime == self._mtime:
+                return
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    self._data = json.load(f)
+            except Exception:
+                pass
+            self._mtime = mtime
+
+    def ready(self) -> bool:
+        if not ENABLED:
+            return False
+        self.reload()
+        return bool(self._data.get("pools")) and time.time() - self._data.get("built", 0) < self.max_age
+
+    def pick(self, label: str, constraints: Dict, skip: Callable[[str], bool]) -> Optional[Dict]:
+        # {"title", "facts"} - 순위대로 보다가 이 세션에서 아직 안 쓴 첫 제목
+        pools = self._data.get("pools", {}).get(label, {})
+        for key in pool_keys(constraints):
+            for entry in pools.get(key, []):
+                if not skip(entry["title"]):
+                    return entry
+        return None
+
+    def save(self, pools: Dict[str, Dict[str, List[Dict]]], short: Optional[Dict[str, int]] = None) -> None:
+        data = {"built": time.time(), "pools": pools, "short": short or {}}
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, self.path)
+        with self._lock:
+            self._data = data
+            self._mtime = os.path.getmtime(self.path)
+
+    def stats(self) -> Dict:
+        pools = self._data.get("pools", {})
+        return {
+            "built": self._data.get("built", 0),
+            "pools": sum(len(p) for p in pools.values()),
+            "titles": sum(len(v) for p in pools.values() for v in p.values()),
+            "short": len(self._data.get("short") or {}),
+        }
+
+
+# -----------------------------
+# 오프라인 빌드: 조건마다 대표 질문으로 봇 think를 여러 번 (이미 나온 제목은 프롬프트로 금지) → KOBIS 검증된 것만
+# -----------------------------
+MAX_MISSES = 2  # 새 제목이 하나도 없는 라운드가 이만큼 이어지면 그만
+
+
+def build_pool(bot, query: str, size: int = POOL_SIZE, max_rounds: Optional[int] = None) -> List[Dict]:
+    entries: List[Dict] = []
+    forbidden: List[str] = []
+    misses = 0
+    for _ in range(max_rounds or size):
+        ideas = bot.think_recommend(user_input=query, constraints={"forbidden_titles": forbidden})
+        new = list(dict.fromkeys(i["title"].strip() for i in ideas if i.get("title") and i["title"].strip() not in forbidden))
+        if not new:
+            misses += 1
+            if misses >= MAX_MISSES:
+                break
+            continue
+        misses = 0
+        forbidden += new
+        facts = bot.verify_movies(new)
+        # think가 낸 순서가 곧 순위 (페르소나가 먼저 떠올린 작품부터)
+        entries += [{"title": t, "facts": facts[t]} for t in new if facts.get(t, {}).get("found")]
+        if len(entries) >= size:
+            break
+    return entries[:size]
+
+
+def build_pools(bots: List, rules: Optional[Dict] = None, size: int = POOL_SIZE) -> Tuple[Dict[str, Dict[str, List[Dict]]], Dict[str, int]]:
+    # 조건 목록은 의도 규칙(intent_rules.json)의 constraints 그대로
+    # (풀, 모자란 풀) - "봇|조건" → 모은 제목 수 (size에 못 미친 것만)
+    if rules is None:
+        with open(RULES_PATH, encoding="utf-8") as f:
+            rules = json.load(f)
+    pools: Dict[str, Dict[str, List[Dict]]] = {bot.label: {} for bot in bots}
+    short: Dict[str, int] = {}
+    for field, values in rules.get("constraints", {}).items():
+        for value, keywords in values.items():
+            query = f"{keywords[0]} 영화 추천해줘"
+            for bot in bots:
+                key = f"{field}:{value}"
+                pools[bot.label][key] = build_pool(bot, query, size)
+                if len(pools[bot.label][key]) < size:
+                    short[f"{bot.label}|{key}"] = len(pools[bot.label][key])
+    return pools, short
+
+
+_pools: Optional[RecommendationPools] = None
+
+
+def default_pools() -> RecommendationPools:
+    global _pools
+    if _pools is None:
+        _pools = RecommendationPools()
+    return _pools
+
+
+if __name__ == "__main__":
+    # python -m utils.pools  (하루 한 번 정도 cron으로)
+    from container import get_container
+
+    parser = argparse.ArgumentParser(description="페르소나 x 조건별 추천 풀 빌드")
+    parser.add_argument("--size", type=int, default=POOL_SIZE)
+    parser.add_argument("--out", default=POOLS_PATH)
+    args = parser.parse_args()
+
+    store = RecommendationPools(args.out)
+    pools, short = build_pools(list(get_container().bots.values()), size=args.size)
+    store.save(pools, short)
+    print(f"→ {args.out} {store.stats()}")
+    for key, n in sorted(short.items()):
+        print(f"  모자람 {key}: {n}/{args.size}")
@@ -0,0 +1,141 @@
+import os
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils import trace
+
+try:
+    import tiktoken
+except ImportError:  # 없으면 근사치로 셈
+    tiktoken = None
+
+# -----------------------------
+# 세그먼트별 토큰 예산 (대화가 길어져도 턴당 프롬프트 크기가 일정하게)
+# -----------------------------
+USED_TITLES_TOKENS = int(os.getenv("PROMPT_USED_TITLES_TOKENS", "120"))
+PREVIOUS_TOKENS = int(os.getenv("PROMPT_PREVIOUS_TOKENS", "400"))
+TOKENIZER = os.getenv("PROMPT_TOKENIZER", "o200k_base")
+
+# 사실 중 근거로 쓸 만한 필드만 (movieCd, confidence 등은 모델에게 의미 없음)
+FACT_FIELDS = ("openDt", "genreAlt", "nationAlt", "directors")
+
+_HANGUL = re.compile(r"[가-힣ㄱ-ㆎ]")
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding(TOKENIZER)
+    except Exception:
+        return None
+
+
+@lru_cache(maxsize=4096)
+def count_tokens(text: str) -> int:
+    # 고정 규칙 문자열은 매번 같은 값이라 캐시
+    if not text:
+        return 0
+    enc = _encoding()
+    if enc is not None:
+        return len(enc.encode(text))
+    # 근사: 한글은 글자당 1토큰, 나머지는 4글자당 1토큰
+    hangul = len(_HANGUL.findall(text))
+    return hangul + (len(text) - hangul + 3) // 4
+
+
+# -----------------------------
+# 세그먼트 직렬화
+# -----------------------------
+def compact_facts(facts: Dict[str, Any]) -> str:
+    lines = []
+    for title, f in facts.items():
+        if not isinstance(f, dict) or not f.get("found"):
+            closest = f.get("closest") if isinstance(f, dict) else None
+            lines.append(f"{title}: KOBIS 미확인" + (f" (비슷한 제목: {closest})" if closest else ""))
+            continue
+        parts = []
+        for k in FACT_FIELDS:
+            v = f.get(k)
+            if not v:
+                continue
+            if k == "openDt":
+                v = f"{str(v)[:4]}년 개봉"
+            elif k == "directors":
+                v = "감독 " + ", ".join(v)
+            parts.append(str(v))
+        name = f.get("movieNm") or title
+        lines.append(f"{name}: " + " / ".join(parts) if parts else name)
+    return "\n".join(lines)
+
+
+def compact_ideas(ideas: List[Dict]) -> str:
+    # 제목 + 한 줄 근거 (빈 필드는 버림)
+    lines = []
+    for it in ideas:
+        title = it.get("title")
+        if not title:
+            continue
+        notes = [str(v) for k, v in it.items() if k != "title" and v]
+        lines.append(title + (" — " + " / ".join(notes) if notes else ""))
+    return "\n".join(lines)
+
+
+def budget_titles(titles: List[str], budget: int = USED_TITLES_TOKENS) -> str:
+    # 최근 것부터 예산만큼 담고 나머지는 개수로만 요약
+    kept: List[str] = []
+    used = 0
+    uniq = list(dict.fromkeys(t for t in titles if t))
+    for t in reversed(uniq):
+        cost = count_tokens(t) + 1
+        if used + cost > budget:
+            break
+        kept.append(t)
+        used += cost
+    kept.reverse()
+    rest = len(uniq) - len(kept)
+    text = ", ".join(kept)
+    if rest:
+        text = f"(그 전에 {rest}편 더 언급됨) " + text
+    return text
+
+
+def budget_text(text: str, budget: int = PREVIOUS_TOKENS) -> str:
+    # 최근 발화가 중요하므로 뒤쪽을 남기고 앞을 자름
+    text = (text or "").strip()
+    if count_tokens(text) <= budget:
+        return text
+    enc = _encoding()
+    if enc is not None:
+        tail = enc.decode(enc.encode(text)[-budget:])
+    else:
+        lo, hi = 0, len(text)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if count_tokens(text[mid:]) > budget:
+                lo = mid + 1
+            else:
+                hi = mid
+        tail = text[lo:]
+    return "…" + tail.lstrip()
+
+
+# -----------------------------
+# 프롬프트 조립 (세그먼트별 토큰을 trace에 기록)
+# -----------------------------
+def build_prompt(sections: List[Tuple[str, Optional[str], str]], static: str = "", **attrs: Any) -> Tuple[str, Dict[str, int]]:
+    # (세그먼트 이름, 제목 or None, 본문) - static은 따로 보내는 고정 접두 (토큰만 같이 기록)
+    with trace.span("prompt", **attrs) as sp:
+        blocks = []
+        tokens: Dict[str, int] = {"static": count_tokens(static)} if static else {}
+        for name, heading, body in sections:
+            # 빈 세그먼트는 제목째 뺌
+            if not (body or "").strip():
+                continue
+            block = f"[{heading}]\n{body}" if heading else body
+            blocks.append(block)
+            tokens[name] = count_tokens(block)
+        sp.set(segments=tokens, prompt_tokens_est=sum(tokens.values()))
+    return "\n\n".join(blocks), tokens
@@ -0,0 +1,144 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, Iterator, Optional
+
+# -----------------------------
+# 설정 (0 이면 제한 없음)
+# -----------------------------
+DAILY_LIMIT = int(os.getenv("KOBIS_DAILY_QUOTA", "3000"))  # 키당 하루 호출 한도
+RATE = float(os.getenv("KOBIS_RATE", "20"))  # 초당 호출
+BURST = int(os.getenv("KOBIS_BURST", "40"))
+QUOTA_PATH = os.getenv("KOBIS_QUOTA_PATH") or os.path.join(tempfile.gettempdir(), "cinematalk_kobis_quota.sqlite")
+
+# 호출 우선순위: 검증 > 후보/박스오피스 > 힌트
+HIGH, NORMAL, LOW = 0, 1, 2
+NAMES = {HIGH: "high", NORMAL: "normal", LOW: "low"}
+# 하루 한도의 몇 %까지 쓸 수 있는지 (남은 건 더 중요한 호출 몫 - 넘으면 캐시에 있는 것만)
+SHARE = {HIGH: 1.0, NORMAL: 0.9, LOW: 0.6}
+# 버킷에 이만큼(버스트 대비)은 남겨두고 가져감 / 토큰을 기다리는 최대 시간 (초)
+RESERVE = {HIGH: 0.0, NORMAL: 0.2, LOW: 0.5}
+WAIT = {HIGH: 2.0, NORMAL: 1.0, LOW: 0.0}
+
+_priority: ContextVar[int] = ContextVar("kobis_priority", default=NORMAL)
+
+
+class QuotaExceeded(RuntimeError):
+    pass
+
+
+@contextmanager
+def priority(level: int) -> Iterator[None]:
+    # 이 블록 안의 KOBIS 호출 우선순위 (스레드 풀로 넘어가도 문맥 복사로 유지)
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> int:
+    return _priority.get()
+
+
+# -----------------------------
+# 토큰 버킷 (초당 호출 수)
+# -----------------------------
+class TokenBucket:
+    def __init__(self, rate: float = RATE, burst: int = BURST):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._t = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, reserve: float = 0.0, timeout: float = 0.0) -> bool:
+        if self.rate <= 0:
+            return True
+        need = 1 + reserve * self.burst
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._t) * self.rate)
+                self._t = now
+                if self._tokens >= need:
+                    self._tokens -= 1
+                    return True
+                wait = (need - self._tokens) / self.rate
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+# -----------------------------
+# 하루 호출 수 (sqlite - 재시작/여러 프로세스가 같은 키를 써도 한 곳에서 셈)
+# -----------------------------
+class DailyQuota:
+    def __init__(self, limit: int = DAILY_LIMIT, path: str = QUOTA_PATH):
+        self.limit = limit
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        with self._lock:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS quota (day TEXT PRIMARY KEY, used INTEGER NOT NULL)")
+            self._conn.commit()
+
+    def try_consume(self, share: float = 1.0) -> bool:
+        # 한도 안이면 1 올리고 True (확인 + 증가를 UPDATE 한 문장으로 - 프로세스 간에도 원자적)
+        if self.limit <= 0:
+            return True
+        day = datetime.now().strftime("%Y%m%d")
+        with self._lock:
+            self._conn.execute("INSERT OR IGNORE INTO quota (day, used) VALUES (?, 0)", (day,))
+            cur = self._conn.execute(
+                "UPDATE quota SET used = used + 1 WHERE day = ? AND used < ?", (day, int(self.limit * share))
+            )
+            self._conn.commit()
+        return cur.rowcount == 1
+
+    def used(self) -> int:
+        day = datetime.now().strftime("%Y%m%d")
+        with self._lock:
+            row = self._conn.execute("SELECT used FROM quota WHERE day = ?", (day,)).fetchone()
+        return row[0] if row else 0
+
+
+# -----------------------------
+# KOBIS 호출 허가: 우선순위별 일일 몫 → 토큰 버킷 (둘 중 하나라도 안 되면 QuotaExceeded)
+# -----------------------------
+class KobisLimiter:
+    def __init__(self, bucket: Optional[TokenBucket] = None, quota: Optional[DailyQuota] = None):
+        self.bucket = bucket or TokenBucket()
+        self.quota = quota or DailyQuota()
+        self.denied: Dict[str, int] = {name: 0 for name in NAMES.values()}
+
+    def acquire(self) -> None:
+        level = current_priority()
+        if not self.bucket.acquire(RESERVE[level], WAIT[level]):
+            self.denied[NAMES[level]] += 1
+            raise QuotaExceeded(f"KOBIS rate limit ({NAMES[level]})")
+        if not self.quota.try_consume(SHARE[level]):
+            self.denied[NAMES[level]] += 1
+            raise QuotaExceeded(f"KOBIS daily quota ({NAMES[level]})")
+
+    def stats(self) -> Dict:
+        return {"used": self.quota.used(), "limit": self.quota.limit, "denied": dict(self.denied)}
+
+
+_limiter: Optional[KobisLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def default_limiter() -> KobisLimiter:
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = KobisLimiter()
+    return _limiter
@@ -0,0 +1,353 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# -----------------------------
+# 설정 (세션 하나/프로세스 전체 메모리가 대화 길이·사용자 수와 상관없이 일정하도록)
+# -----------------------------
+WINDOW = int(os.getenv("SESSION_WINDOW", "40"))  # 메모리에 두는 최근 메시지 수
+MAX_BYTES = int(os.getenv("SESSION_MAX_BYTES", str(256 * 1024)))  # 세션당 메시지 본문 상한
+MAX_TITLES = int(os.getenv("SESSION_MAX_TITLES", "500"))  # 언급된 영화 (오래된 것부터 잊음)
+IDLE_TTL = float(os.getenv("SESSION_IDLE_TTL", str(30 * 60)))  # 이만큼 안 쓰면 메모리에서 내림
+MAX_SESSIONS = int(os.getenv("SESSION_MAX", "10000"))  # 메모리에 두는 세션 수
+ARCHIVE_TTL = float(os.getenv("SESSION_ARCHIVE_TTL", str(7 * 24 * 60 * 60)))
+ARCHIVE_PATH = os.getenv("SESSION_ARCHIVE_PATH") or os.path.join(tempfile.gettempdir(), "cinematalk_sessions.sqlite")
+SWEEP_INTERVAL = 30.0
+
+
+# -----------------------------
+# 순서 있는 제목 집합 (in 검사 O(1), 상한 넘으면 오래된 것부터 빠짐)
+# 리스트처럼 순회/더하기 가능 (used_titles + [...] 그대로 동작)
+# -----------------------------
+class TitleSet:
+    __slots__ = ("_order", "_set", "limit")
+
+    def __init__(self, titles: Iterable[str] = (), limit: int = MAX_TITLES):
+        self._order: Deque[str] = deque()
+        self._set: set = set()
+        self.limit = limit
+        self.extend(titles)
+
+    def append(self, title: str) -> None:
+        if not title or title in self._set:
+            return
+        self._order.append(title)
+        self._set.add(title)
+        while len(self._order) > self.limit:
+            self._set.discard(self._order.popleft())
+
+    def extend(self, titles: Iterable[str]) -> None:
+        for t in titles:
+            self.append(t)
+
+    def __contains__(self, title: object) -> bool:
+        return title in self._set
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._order)
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __add__(self, other: Iterable[str]) -> List[str]:
+        return list(self._order) + list(other)
+
+    def __eq__(self, other: object) -> bool:
+        return list(self) == list(other) if isinstance(other, (TitleSet, list)) else NotImplemented
+
+    def __repr__(self) -> str:
+        return f"TitleSet({list(self._order)!r})"
+
+
+def ensure_titles(context: Dict, key: str = "used_titles") -> TitleSet:
+    # 예전 context(리스트)도 그대로 받음
+    titles = context.get(key)
+    if not isinstance(titles, TitleSet):
+        titles = context[key] = TitleSet(titles or [])
+    return titles
+
+
+# -----------------------------
+# 보관소 (창 밖으로 밀려난 메시지 + 메모리에서 내린 세션 상태)
+# -----------------------------
+class HistoryArchive:
+    def __init__(self, path: str = ARCHIVE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS messages ("
+                "session_id TEXT NOT NULL, seq INTEGER NOT NULL, body TEXT NOT NULL, "
+                "PRIMARY KEY (session_id, seq))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "session_id TEXT PRIMARY KEY, state TEXT NOT NULL, touched REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS sessions_touched ON sessions(touched)")
+            self._conn.commit()
+
+    def append(self, session_id: str, items: List[Tuple[int, Dict]]) -> None:
+        if not items:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO messages (session_id, seq, body) VALUES (?, ?, ?)",
+                [(session_id, seq, json.dumps(m, ensure_ascii=False)) for seq, m in items],
+            )
+            self._conn.commit()
+
+    def page(self, session_id: str, before: int, limit: int) -> List[Tuple[int, Dict]]:
+        # seq < before 인 것 중 최근 limit개 (오래된 순으로)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, body FROM messages WHERE session_id = ? AND seq < ? ORDER BY seq DESC LIMIT ?",
+                (session_id, before, limit),
+            ).fetchall()
+        return [(seq, json.loads(body)) for seq, body in reversed(rows)]
+
+    def save_state(self, session_id: str, state: Dict) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, state, touched) VALUES (?, ?, ?)",
+                (session_id, json.dumps(state, ensure_ascii=False), state.get("touched", time.time())),
+            )
+            self._conn.commit()
+
+    def load_state(self, session_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT state FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+            self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            self._conn.commit()
+
+    def prune(self, older_than: float) -> int:
+        # 오래 안 돌아온 세션은 보관소에서도 지움
+        with self._lock:
+            ids = [r[0] for r in self._conn.execute(
+                "SELECT session_id FROM sessions WHERE touched < ?", (older_than,)
+            ).fetchall()]
+            for sid in ids:
+                self._conn.execute("DELETE FROM messages WHERE session_id = ?", (sid,))
+            self._conn.execute("DELETE FROM sessions WHERE touched < ?", (older_than,))
+            self._conn.commit()
+        return len(ids)
+
+
+def _message_bytes(m: Dict) -> int:
+    return sum(len(str(v).encode("utf-8")) for v in m.values()) + 64
+
+
+# -----------------------------
+# 서버 쪽 세션 (대화 context + 최근 메시지 창)
+# lock: 한 세션에서 턴은 한 번에 하나만 (context를 턴이 직접 고침)
+# -----------------------------
+class Session:
+    def __init__(self, session_id: str, archive: HistoryArchive, window: int = WINDOW, max_bytes: int = MAX_BYTES):
+        self.id = session_id
+        self.archive = archive
+        self.window = window
+        self.max_bytes = max_bytes
+        self.context: Dict[str, Any] = {"used_titles": TitleSet()}
+        self.shown_posters = TitleSet(limit=window)
+        self._messages: Deque[Tuple[int, Dict]] = deque()
+        self._bytes = 0
+        self._next_seq = 0
+        self._archived_upto = 0  # 이 seq 미만은 이미 보관소에 있음
+        self._msg_lock = threading.Lock()
+        self.lock = threading.Lock()
+        self.created = time.time()
+        self.touched = self.created
+
+    def touch(self) -> None:
+        self.touched = time.time()
+
+    # --- 메시지 ---
+    @property
+    def messages(self) -> List[Dict]:
+        with self._msg_lock:
+            return [m for _, m in self._messages]
+
+    @property
+    def archived(self) -> int:
+        # 창 밖(보관소에만 있는) 메시지 수
+        with self._msg_lock:
+            return self._messages[0][0] if self._messages else self._next_seq
+
+    def add_message(self, message: Dict) -> None:
+        with self._msg_lock:
+            self._messages.append((self._next_seq, message))
+            self._next_seq += 1
+            self._bytes += _message_bytes(message)
+            # 창 크기 또는 바이트 상한을 넘으면 오래된 것부터 보관소로
+            out = []
+            while len(self._messages) > 1 and (len(self._messages) > self.window or self._bytes > self.max_bytes):
+                seq, m = self._messages.popleft()
+                self._bytes -= _message_bytes(m)
+                if seq >= self._archived_upto:
+                    out.append((seq, m))
+        self.archive.append(self.id, out)
+
+    def history(self, before: Optional[int] = None, limit: int = 50) -> List[Dict]:
+        # 최근 메시지부터 거꾸로 페이지 (창 → 보관소)
+        with self._msg_lock:
+            before = self._next_seq if before is None else before
+            window = [(s, m) for s, m in self._messages if s < before]
+            first = self._messages[0][0] if self._messages else self._next_seq
+        items = window[-limit:]
+        if len(items) < limit and first > 0:
+            items = self.archive.page(self.id, min(before, first), limit - len(items)) + items
+        return [dict(m, seq=s) for s, m in items]
+
+    # --- 보관/복원 ---
+    def park(self) -> None:
+        # 메모리에서 내리기 전에 아직 안 보낸 메시지 + 상태를 보관소로
+        with self._msg_lock:
+            out = [(s, m) for s, m in self._messages if s >= self._archived_upto]
+            self._archived_upto = self._next_seq
+        self.archive.append(self.id, out)
+        self.archive.save_state(self.id, {
+            "used_titles": list(self.context.get("used_titles", [])),
+            "shown_posters": list(self.shown_posters),
+            "next_seq": self._next_seq,
+            "created": self.created,
+            "touched": self.touched,
+        })
+
+    @classmethod
+    def restore(cls, session_id: str, archive: HistoryArchive, state: Dict) -> "Session":
+        s = cls(session_id, archive)
+        s.context["used_titles"] = TitleSet(state.get("used_titles") or [])
+        s.shown_posters = TitleSet(state.get("shown_posters") or [], limit=s.window)
+        s._next_seq = s._archived_upto = int(state.get("next_seq") or 0)
+        s.created = state.get("created") or s.created
+        for seq, m in archive.page(session_id, s._next_seq, s.window):
+            s._messages.append((seq, m))
+            s._bytes += _message_bytes(m)
+        s.touch()
+        return s
+
+    def to_dict(self) -> Dict:
+        return {
+            "session_id": self.id,
+            "created": round(self.created, 3),
+            "touched": round(self.touched, 3),
+            "used_titles": list(self.context.get("used_titles", [])),
+            "messages": self.messages,
+            "archived_messages": self.archived,
+        }
+
+
+# -----------------------------
+# 세션 저장소: 최근에 쓴 순서(LRU)로 메모리에 두고,
+# 오래 쉬었거나 개수 상한을 넘으면 보관소로 내림 (다시 오면 복원)
+# -----------------------------
+class SessionStore:
+    def __init__(
+        self,
+        archive: Optional[HistoryArchive] = None,
+        idle_ttl: float = IDLE_TTL,
+        max_sessions: int = MAX_SESSIONS,
+    ):
+        self.archive = archive or HistoryArchive()
+        self.idle_ttl = idle_ttl
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_sweep = time.time()
+        self.evicted = 0
+
+    def create(self) -> Session:
+        s = Session(uuid.uuid4().hex, self.archive)
+        with self._lock:
+            self._sessions[s.id] = s
+        self._maybe_sweep()
+        return s
+
+    def get(self, session_id: str) -> Optional[Session]:
+        # touch는 락 안에서 (sweep이 보관소에 쓰는 사이에 다시 쓰인 세션은 내리지 않게)
+        with self._lock:
+            s = self._sessions.get(session_id)
+            if s:
+                self._sessions.move_to_end(session_id)
+                s.touch()
+        if s is None:
+            state = self.archive.load_state(session_id)
+            if state is None:
+                return None
+            restored = Session.restore(session_id, self.archive, state)
+            with self._lock:
+                # 동시에 복원했으면 먼저 들어간 쪽을 씀
+                s = self._sessions.setdefault(session_id, restored)
+                s.touch()
+        self._maybe_sweep()
+        return s
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            found = self._sessions.pop(session_id, None) is not None
+        if not found and self.archive.load_state(session_id) is None:
+            return False
+        self.archive.delete(session_id)
+        return True
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _maybe_sweep(self) -> None:
+        if len(self._sessions) <= self.max_sessions and time.time() - self._last_sweep < SWEEP_INTERVAL:
+            return
+        self.sweep()
+
+    def sweep(self) -> int:
+        now = time.time()
+        self._last_sweep = now
+        candidates: List[Tuple[Session, float]] = []
+        with self._lock:
+            over = len(self._sessions) - self.max_sessions
+            # LRU 순서라 앞쪽이 가장 오래 쉰 세션 (턴이 도는 중이면 건너뜀)
+            for s in list(self._sessions.values()):
+                idle = now - s.touched > self.idle_ttl
+                if not idle and over <= 0:
+                    break
+                if s.lock.locked():
+                    continue
+                candidates.append((s, s.touched))
+                over -= 1
+
+        # 보관소에 먼저 쓰고 나서 맵에서 뺌 (그 사이 get이 와도 메모리의 세션을 받음)
+        # 쓰는 동안 다시 쓰인 세션은 그대로 둠 - 다음 sweep에서 다시 봄
+        evicted = 0
+        for s, touched in candidates:
+            s.park()
+            with self._lock:
+                if self._sessions.get(s.id) is s and s.touched == touched and not s.lock.locked():
+                    del self._sessions[s.id]
+                    evicted += 1
+        self.evicted += evicted
+        self.archive.prune(now - ARCHIVE_TTL)
+        return evicted
+
+
+_store: Optional[SessionStore] = None
+_store_lock = threading.Lock()
+
+
+def default_store() -> SessionStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = SessionStore()
+    return _store
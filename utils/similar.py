@@ -0,0 +1,250 @@
+import argparse
+import json
+import math
+import os
+import re
+import threading
+import zlib
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # 없으면 인덱스 없이 (원래대로 LLM 추측만)
+    np = None
+
+from utils.catalog import Catalog, norm
+
+# -----------------------------
+# 설정 (SIMILAR_INDEX_PATH 가 있어야 켜짐 - <경로>.npy 행렬 + <경로>.json 메타)
+# -----------------------------
+INDEX_PATH = os.getenv("SIMILAR_INDEX_PATH")
+DIM = int(os.getenv("SIMILAR_DIM", "512"))  # 특징 해싱 차원
+TOP_K = int(os.getenv("SIMILAR_TOP_K", "8"))
+RERANK = 8  # 해시 충돌 보정: top-k x RERANK 개를 실제 특징으로 다시 점수
+CHUNK = 65536  # 한 번에 곱하는 행 수 (mmap에서 조금씩 읽음)
+
+# "비슷한 영화" 요청으로 보는 표현 - 이게 있을 때만 기준 영화를 찾음
+SIMILAR_WORDS = ("비슷한", "비슷하게", "같은 영화", "같은 느낌", "처럼", "류의", "닮은")
+# 제목 뒤에 붙는 조사/어미 (기생충이랑 → 기생충)
+JOSA = ("이랑", "하고", "같은", "처럼", "이나", "랑", "과", "와", "나", "을", "를", "이", "가", "은", "는", "의")
+# 기준 영화 여러 편을 잇는 조사 (기생충이랑 올드보이 같은 → 둘 다)
+LINK = ("이랑", "하고", "이나", "랑", "과", "와", "나")
+STOP = {"영화", "추천", "추천해줘", "비슷한", "같은", "느낌", "작품"}
+
+# 필드별 가중치 (감독 > 배우 = 장르 > 국가/연대)
+WEIGHTS = {"d": 1.5, "a": 1.0, "g": 1.0, "w": 0.5, "n": 0.5, "e": 0.5}
+
+
+def _split(value: Optional[str]) -> List[str]:
+    return [x.strip() for x in (value or "").split(",") if x.strip()]
+
+
+def movie_features(movie: Dict, info: Optional[Dict] = None) -> List[str]:
+    # 카탈로그 필드 + (있으면) movieInfo의 배우/관람등급 → "필드:값" 토큰
+    feats = [f"g:{g}" for g in _split(movie.get("genreAlt"))]
+    feats += [f"n:{n}" for n in _split(movie.get("nationAlt"))]
+    feats += [f"d:{d}" for d in movie.get("directors") or []]
+    year = (movie.get("openDt") or movie.get("prdtYear") or "")[:4]
+    if year.isdigit():
+        feats.append(f"e:{int(year) // 10 * 10}")
+    if info:
+        feats += [f"g:{g['genreNm']}" for g in info.get("genres") or [] if g.get("genreNm")]
+        feats += [f"a:{a['peopleNm']}" for a in (info.get("actors") or [])[:5] if a.get("peopleNm")]
+        feats += [f"w:{w['watchGradeNm']}" for w in (info.get("audits") or [])[:1] if w.get("watchGradeNm")]
+    return list(dict.fromkeys(feats))
+
+
+def _slot(feature: str, dim: int) -> Tuple[int, float]:
+    # 해시 충돌이 한쪽으로 쏠리지 않게 부호도 해시로
+    h = zlib.crc32(feature.encode("utf-8"))
+    return h % dim, 1.0 if (h >> 31) & 1 else -1.0
+
+
+def _seed_windows(words: List[str]) -> List[List[str]]:
+    # 유사 표현마다 그 앞 단어들 (표현이 단어에 붙어 있으면 붙은 앞부분까지: 기생충처럼 → 기생충)
+    windows: List[List[str]] = []
+    for j, w in enumerate(words):
+        following = " ".join(words[j:j + 2])
+        for phrase in SIMILAR_WORDS:
+            if w == phrase.split()[0] and following.startswith(phrase):
+                windows.append(words[:j])
+                break
+            at = w.find(phrase)
+            if " " not in phrase and at > 0:
+                windows.append(words[:j] + [w[:at]])
+                break
+    return [w for w in windows if w]
+
+
+def _facts(m: Dict) -> Dict:
+    # verify_titles 결과와 같은 모양 (카탈로그에 있는 영화라 이미 확인된 것)
+    return {"found": True, "confidence": 1.0, **{k: m[k] for k in ("movieCd", "movieNm", "openDt", "genreAlt", "nationAlt", "directors") if m.get(k)}}
+
+
+# -----------------------------
+# 유사 영화 인덱스: TF-IDF 특징 해싱 → L2 정규화 float32 행렬 (mmap) → 코사인 top-k
+# -----------------------------
+class SimilarIndex:
+    def __init__(self, matrix, movies: List[Dict], idf: Dict[str, float], built: str = ""):
+        # movies[i]["f"]: i행의 특징 토큰 (재점수용)
+        self.matrix = matrix
+        self.movies = movies
+        self.idf = idf
+        self.built = built
+        self._by_title: Dict[str, int] = {}
+        for i, m in enumerate(movies):
+            for k in (norm(m.get("movieNm", "")), norm(m.get("movieNmEn", ""))):
+                if k and k not in self._by_title:
+                    self._by_title[k] = i
+
+    # --- 빌드 (오프라인) ---
+    @classmethod
+    def build(cls, movies: List[Dict], infos: Optional[Dict[str, Dict]] = None, dim: int = DIM, built: str = "") -> "SimilarIndex":
+        infos = infos or {}
+        movies = [{**m, "f": movie_features(m, infos.get(m.get("movieCd", "")))} for m in movies]
+        df = Counter(f for m in movies for f in m["f"])
+        n = max(len(movies), 1)
+        idf = {f: round(math.log((1 + n) / (1 + c)), 4) for f, c in df.items()}
+
+        matrix = np.zeros((len(movies), dim), dtype=np.float32)
+        for i, m in enumerate(movies):
+            for f in m["f"]:
+                slot, sign = _slot(f, dim)
+                matrix[i, slot] += sign * WEIGHTS.get(f[0], 1.0) * idf[f]
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix /= np.maximum(norms, 1e-9)
+        return cls(matrix, movies, idf, built)
+
+    def save(self, path: str) -> None:
+        np.save(path + ".npy", self.matrix)
+        tmp = path + ".json.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"built": self.built, "idf": self.idf, "movies": self.movies}, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path + ".json")
+
+    @classmethod
+    def load(cls, path: str) -> "SimilarIndex":
+        # 행렬은 mmap으로 (프로세스 여러 개가 페이지 캐시를 같이 씀)
+        with open(path + ".json", encoding="utf-8") as f:
+            meta = json.load(f)
+        return cls(np.load(path + ".npy", mmap_mode="r"), meta.get("movies", []), meta.get("idf", {}), meta.get("built", ""))
+
+    # --- 조회 ---
+    def find_seeds(self, text: str, limit: int = 3) -> List[int]:
+        # "비슷한/같은 영화/처럼" 바로 앞 단어들에서만 제목을 찾음 (긴 것부터, 끝 조사 떼고)
+        # 문장 아무 데나 있는 한 단어 제목(가족/여름/사랑...)이 기준 영화가 되지 않게
+        seeds: List[int] = []
+        for window in _seed_windows(re.findall(r"\S+", text)):
+            while window and len(seeds) < limit:
+                for n in range(min(4, len(window)), 0, -1):
+                    row = self._title_row(window[-n:])
+                    if row is not None:
+                        break
+                else:
+                    break
+                if row not in seeds:
+                    seeds.append(row)
+                window = window[:-n]
+                # 앞 단어가 잇는 조사로 끝나야 (기생충이랑 올드보이 같은) 한 편 더
+                if not window or not window[-1].endswith(LINK):
+                    break
+        return seeds[:limit]
+
+    def _title_row(self, words: List[str]) -> Optional[int]:
+        key = norm("".join(words))
+        for cand in [key] + [key[: -len(j)] for j in JOSA if key.endswith(j) and len(key) > len(j)]:
+            if len(cand) >= 2 and cand not in STOP and cand in self._by_title:
+                return self._by_title[cand]
+        return None
+
+    def search(self, queries, k: int = TOP_K, exclude: Iterable[int] = ()) -> List[List[Tuple[int, float]]]:
+        # queries: (q, dim) - 행렬을 CHUNK 행씩 한 번에 곱하고 청크별 top-k를 합침
+        queries = np.asarray(queries, dtype=np.float32)
+        skip = np.fromiter(set(exclude), dtype=np.int64)
+        best_idx = np.empty((len(queries), 0), dtype=np.int64)
+        best_score = np.empty((len(queries), 0), dtype=np.float32)
+        for start in range(0, len(self.movies), CHUNK):
+            scores = queries @ np.asarray(self.matrix[start:start + CHUNK]).T
+            local = skip[(skip >= start) & (skip < start + scores.shape[1])] - start
+            scores[:, local] = -np.inf
+            take = min(k, scores.shape[1])
+            idx = np.argpartition(-scores, take - 1, axis=1)[:, :take]
+            best_idx = np.concatenate([best_idx, idx + start], axis=1)
+            best_score = np.concatenate([best_score, np.take_along_axis(scores, idx, axis=1)], axis=1)
+        order = np.argsort(-best_score, axis=1)[:, :k]
+        return [
+            [(int(best_idx[q, j]), float(best_score[q, j])) for j in order[q] if np.isfinite(best_score[q, j])]
+            for q in range(len(queries))
+        ]
+
+    def _weights(self, i: int) -> Dict[str, float]:
+        w = {f: WEIGHTS.get(f[0], 1.0) * self.idf.get(f, 0.0) for f in self.movies[i].get("f") or []}
+        total = math.sqrt(sum(v * v for v in w.values())) or 1.0
+        return {f: v / total for f, v in w.items()}
+
+    def similar(self, seeds: List[int], k: int = TOP_K, skip_titles: Iterable[str] = ()) -> List[Dict]:
+        # 기준 영화들의 평균 방향으로 검색 → 후보만 실제 특징으로 재점수 → verify_titles 모양의 facts 목록
+        if not seeds:
+            return []
+        skip = set(skip_titles)
+        query = np.asarray(self.matrix[seeds]).mean(axis=0, keepdims=True)
+        hits = self.search(query, k * RERANK, exclude=seeds)[0]
+
+        target: Dict[str, float] = Counter()
+        for s in seeds:
+            target.update(self._weights(s))
+        scored = []
+        for i, _ in hits:
+            if self.movies[i].get("movieNm") in skip:
+                continue
+            score = sum(v * target.get(f, 0.0) for f, v in self._weights(i).items())
+            scored.append((score, -int(self.movies[i].get("openDt") or 0), i))
+        scored.sort(reverse=True)
+        return [_facts(self.movies[i]) for _, _, i in scored[:k]]
+
+    def candidates(self, text: str, k: int = TOP_K, skip_titles: Iterable[str] = ()) -> List[Dict]:
+        if not any(w in text for w in SIMILAR_WORDS):
+            return []
+        return self.similar(self.find_seeds(text), k, skip_titles)
+
+
+_index: Optional[SimilarIndex] = None
+_lock = threading.Lock()
+
+
+def default_index() -> Optional[SimilarIndex]:
+    # SIMILAR_INDEX_PATH 인덱스가 있으면 한 번만 로드해서 공유 (numpy 없으면 None)
+    global _index
+    if _index is None and np is not None and INDEX_PATH and os.path.exists(INDEX_PATH + ".npy"):
+        with _lock:
+            if _index is None:
+                _index = SimilarIndex.load(INDEX_PATH)
+    return _index
+
+
+if __name__ == "__main__":
+    from utils.cache import MemoryCache
+    from utils.kobis import KobisClient
+
+    parser = argparse.ArgumentParser(description="로컬 카탈로그로 유사 영화 인덱스 빌드")
+    parser.add_argument("catalog", help="카탈로그 경로 (python -m utils.catalog 결과)")
+    parser.add_argument("out", help="저장 경로 (확장자 없이 - .npy/.json 두 파일)")
+    parser.add_argument("--info", type=int, default=0, help="최근작 N편은 movieInfo로 배우/관람등급까지 (KOBIS 호출 N번)")
+    parser.add_argument("--dim", type=int, default=DIM)
+    args = parser.parse_args()
+
+    catalog = Catalog.load(args.catalog)
+    infos: Dict[str, Dict] = {}
+    if args.info:
+        client = KobisClient(cache=MemoryCache(max_entries=1))
+        recent = sorted(catalog.movies, key=lambda m: -int(m.get("openDt") or 0))[: args.info]
+        for m in recent:
+            try:
+                data = client.search_movie_info(m["movieCd"])
+                infos[m["movieCd"]] = data.get("movieInfoResult", {}).get("movieInfo", {})
+            except Exception:
+                continue
+    index = SimilarIndex.build(catalog.movies, infos, dim=args.dim, built=catalog.built)
+    index.save(args.out)
+    print(f"movies={len(index.movies)} dim={args.dim} info={len(infos)} → {args.out}.npy/.json")
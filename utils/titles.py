@@ -0,0 +1,152 @@
+import re
+import unicodedata
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.cache import MemoryCache, ResponseCache
+
+# -----------------------------
+# 한글 자모 분해
+# -----------------------------
+_CHO = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_JUNG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+_JONG = " ㄱㄲㄳㄴㄵㄶㄷㄹㄺㄻㄼㄽㄾㄿㅀㅁㅂㅄㅅㅆㅇㅈㅊㅋㅌㅍㅎ"
+
+DAY = 60 * 60 * 24
+
+# 이 점수 미만이면 "찾지 못함"으로 본다
+MIN_CONFIDENCE = 0.6
+
+
+def decompose(text: str) -> str:
+    # "기생충" → "ㄱㅣㅅㅐㅇㅊㅜㅇ" (한 글자 오타/받침 차이를 부분 점수로)
+    out = []
+    for ch in text:
+        code = ord(ch) - 0xAC00
+        if 0 <= code < 11172:
+            out.append(_CHO[code // 588])
+            out.append(_JUNG[(code % 588) // 28])
+            if code % 28:
+                out.append(_JONG[code % 28])
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def normalize_title(text: str) -> str:
+    t = unicodedata.normalize("NFC", text or "").lower()
+    return re.sub(r"[^\w]+", "", t)
+
+
+def title_variants(title: str) -> List[str]:
+    # 원제 → 괄호/부제 뗀 제목 순서로 검색해본다
+    t = (title or "").strip()
+    variants = [t]
+    no_paren = re.sub(r"\s*[\(\[（<《].*?[\)\]）>》]\s*", " ", t).strip()
+    main = re.split(r"\s*[:：\-–—]\s+|\s*[:：]\s*", no_paren)[0].strip()
+    for v in (no_paren, main):
+        if v and v not in variants:
+            variants.append(v)
+    return variants
+
+
+# -----------------------------
+# 유사도 (자모 bigram Dice + 편집거리)
+# -----------------------------
+def _bigrams(s: str) -> List[str]:
+    return [s[i:i + 2] for i in range(len(s) - 1)] or [s]
+
+
+def _dice(a: str, b: str) -> float:
+    ga, gb = _bigrams(a), _bigrams(b)
+    pool = list(gb)
+    common = 0
+    for g in ga:
+        if g in pool:
+            pool.remove(g)
+            common += 1
+    return 2 * common / (len(ga) + len(gb))
+
+
+def _edit_ratio(a: str, b: str) -> float:
+    if a == b:
+        return 1.0
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        prev = cur
+    return 1 - prev[-1] / max(len(a), len(b))
+
+
+def similarity(a: str, b: str) -> float:
+    na, nb = normalize_title(a), normalize_title(b)
+    if not na or not nb:
+        return 0.0
+    if na == nb:
+        return 1.0
+    ja, jb = decompose(na), decompose(nb)
+    score = 0.5 * _dice(ja, jb) + 0.5 * _edit_ratio(ja, jb)
+    # 한쪽이 다른 쪽의 앞부분이면(부제 차이) 가산
+    if na.startswith(nb) or nb.startswith(na):
+        score = max(score, 0.85)
+    return round(score, 3)
+
+
+def rank(title: str, movies: List[Dict[str, Any]]) -> List[Tuple[float, Dict[str, Any]]]:
+    # 부제/괄호를 뗀 변형까지 포함해 가장 높은 점수
+    queries = title_variants(title)
+    scored = []
+    for m in movies:
+        names = [m.get("movieNm", ""), m.get("movieNmEn", "")]
+        s = max(similarity(q, n) for q in queries for n in names)
+        scored.append((s, m))
+    # 점수 → 개봉일 최신 순
+    scored.sort(key=lambda x: (-x[0], -int(x[1].get("openDt") or 0)))
+    return scored
+
+
+# -----------------------------
+# 매칭 결과 캐시 (정규화 제목 기준 → 표현만 다른 제목은 네트워크 없이 해결)
+# -----------------------------
+class TitleMatcher:
+    def __init__(self, cache: Optional[ResponseCache] = None):
+        self.cache = cache or MemoryCache(max_entries=4096)
+
+    def lookup(self, title: str) -> Optional[Dict[str, Any]]:
+        return self.cache.get("title:" + normalize_title(title))
+
+    def match(self, title: str, movies: List[Dict[str, Any]]) -> Dict[str, Any]:
+        ranked = rank(title, movies)
+        if not ranked or ranked[0][0] < MIN_CONFIDENCE:
+            facts: Dict[str, Any] = {"found": False}
+            if ranked:
+                facts["confidence"] = ranked[0][0]
+                facts["closest"] = ranked[0][1].get("movieNm")
+            return facts
+
+        score, m = ranked[0]
+        return {
+            "found": True,
+            "confidence": score,
+            "movieCd": m.get("movieCd"),
+            "movieNm": m.get("movieNm"),
+            "openDt": m.get("openDt"),
+            "genreAlt": m.get("genreAlt"),
+            "nationAlt": m.get("nationAlt"),
+            "directors": [d.get("peopleNm") for d in (m.get("directors") or []) if d.get("peopleNm")],
+        }
+
+    def remember(self, title: str, facts: Dict[str, Any]) -> None:
+        # 못 찾은 결과는 짧게 (새 개봉작 반영)
+        self.cache.set("title:" + normalize_title(title), facts, 7 * DAY if facts.get("found") else DAY)
+
+
+_default_matcher: Optional[TitleMatcher] = None
+
+
+def default_matcher() -> TitleMatcher:
+    global _default_matcher
+    if _default_matcher is None:
+        _default_matcher = TitleMatcher()
+    return _default_matcher
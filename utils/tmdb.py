@@ -1,52 +1,112 @@
-import os
-import requests
-import streamlit as st
-from urllib.parse import quote
-from dotenv import load_dotenv
-
-load_dotenv()
-
-# 1. 로컬 환경변수 먼저 로드
-TMDB_API_KEY = os.getenv("TMDB_API_KEY")
-
-# 2. 클라우드 Secrets 있으면 덮어쓰기 (에러 무시)
-try:
-    if "TMDB_API_KEY" in st.secrets:
-        TMDB_API_KEY = st.secrets["TMDB_API_KEY"]
-except:
-    pass
-
-
-def get_poster_url(movie_title: str) -> str | None:
-    """
-    영화 제목으로 TMDB 검색 → 가장 상단 결과의 포스터 URL 반환
-    API 키 없거나 실패 시 None
-    """
-    if not TMDB_API_KEY or not movie_title:
-        return None
-
-    try:
-        query = quote(movie_title)
-        url = (
-            "https://api.themoviedb.org/3/search/movie"
-            f"?api_key={TMDB_API_KEY}"
-            f"&query={query}"
-            "&language=ko-KR"
-        )
-
-        r = requests.get(url, timeout=8)
-        r.raise_for_status()
-        data = r.json()
-
-        results = data.get("results", [])
-        if not results:
-            return None
-
-        poster_path = results[0].get("poster_path")
-        if not poster_path:
-            return None
-
-        return f"https://image.tmdb.org/t/p/w500{poster_path}"
-
-    except Exception:
-        return None
\ No newline at end of file
+import contextvars
+import os
+import threading
+import streamlit as st
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+
+from utils import http, trace
+from utils.cache import MemoryCache, ResponseCache, SqliteCache
+
+load_dotenv()
+
+# 1. 로컬 환경변수 먼저 로드
+TMDB_API_KEY = os.getenv("TMDB_API_KEY")
+
+# 2. 클라우드 Secrets 있으면 덮어쓰기 (에러 무시)
+try:
+    if "TMDB_API_KEY" in st.secrets:
+        TMDB_API_KEY = st.secrets["TMDB_API_KEY"]
+except:
+    pass
+
+
+DAY = 60 * 60 * 24
+
+# 포스터 캐시: 제목 → URL ("" = 포스터 없음, 음성 결과도 캐시)
+POSTER_TTL = 30 * DAY
+MISS_TTL = DAY
+
+_cache_path = os.getenv("TMDB_POSTER_CACHE_PATH")
+_cache: ResponseCache = SqliteCache(_cache_path) if _cache_path else MemoryCache(max_entries=4096)
+
+_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="poster")
+_inflight: Dict[str, Future] = {}
+_lock = threading.Lock()
+
+
+def _fetch_poster_url(movie_title: str) -> Tuple[Optional[str], bool]:
+    """
+    영화 제목으로 TMDB 검색 → 가장 상단 결과의 포스터 URL 반환
+    (url, 성공 여부) - 네트워크 오류는 캐시하지 않도록 구분
+    """
+    try:
+        with trace.span("tmdb", cache="miss") as sp:
+            r = http.get(
+                "https://api.themoviedb.org/3/search/movie",
+                params={"api_key": TMDB_API_KEY, "query": movie_title, "language": "ko-KR"},
+                timeout=8,
+            )
+            r.raise_for_status()
+            sp.set(bytes=len(r.content))
+            data = r.json()
+
+        results = data.get("results", [])
+        if not results:
+            return None, True
+
+        poster_path = results[0].get("poster_path")
+        if not poster_path:
+            return None, True
+
+        return f"https://image.tmdb.org/t/p/w500{poster_path}", True
+
+    except Exception:
+        return None, False
+
+
+def _resolve(movie_title: str) -> Optional[str]:
+    url, ok = _fetch_poster_url(movie_title)
+    if ok:
+        _cache.set(movie_title, url or "", POSTER_TTL if url else MISS_TTL)
+    return url
+
+
+def _forget(movie_title: str) -> None:
+    with _lock:
+        _inflight.pop(movie_title, None)
+
+
+def prefetch_posters(titles: List[str]) -> None:
+    """
+    턴에서 고른 제목들의 포스터를 백그라운드에서 미리 조회 (바로 반환)
+    """
+    if not TMDB_API_KEY:
+        return
+    for t in titles:
+        if not t or _cache.get(t) is not None:
+            continue
+        with _lock:
+            if t in _inflight:
+                continue
+            fut = _pool.submit(contextvars.copy_context().run, _resolve, t)
+            _inflight[t] = fut
+        fut.add_done_callback(lambda _, t=t: _forget(t))
+
+
+def get_poster_url(movie_title: str) -> str | None:
+    """
+    영화 제목 → 포스터 URL (캐시에서만 - 렌더링은 TMDB를 기다리지 않음)
+    캐시에 없으면 백그라운드 조회만 걸어두고 None (다음 rerun 때 표시)
+    API 키 없거나 실패 시 None
+    """
+    if not TMDB_API_KEY or not movie_title:
+        return None
+
+    cached = _cache.get(movie_title)
+    if cached is not None:
+        return cached or None
+
+    prefetch_posters([movie_title])
+    return None
@@ -0,0 +1,257 @@
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# -----------------------------
+# 설정 (TRACE=off 로 끄기)
+# -----------------------------
+ENABLED = os.getenv("TRACE", "on").lower() not in ("off", "0", "false")
+TRACE_PATH = os.getenv("TRACE_PATH")  # JSON-lines 파일 (없으면 기록 안 함)
+
+# 상위 span의 이 라벨은 하위 span에 그대로 물려줌 (봇별/의도별 집계용)
+INHERITED = ("intent", "bot")
+
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+_current: ContextVar[Optional["Span"]] = ContextVar("trace_span", default=None)
+_sink_lock = threading.Lock()
+
+
+class Span:
+    def __init__(self, name: str, parent: Optional["Span"] = None, **attrs: Any):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex[:12]
+        self.parent = parent.name if parent else None
+        self.labels = {k: parent.labels[k] for k in INHERITED if parent and k in parent.labels}
+        self.attrs: Dict[str, Any] = {}
+        self.set(**attrs)
+        self.start = time.time()
+        self._t0 = time.perf_counter()
+        self.duration = 0.0
+        self.error: Optional[str] = None
+
+    def set(self, **attrs: Any) -> "Span":
+        # intent/bot은 라벨로, 나머지(bytes, cache, tokens 등)는 속성으로
+        for k, v in attrs.items():
+            if k in INHERITED:
+                self.labels[k] = v
+            else:
+                self.attrs[k] = v
+        return self
+
+    def elapsed_ms(self) -> float:
+        return round((time.perf_counter() - self._t0) * 1000, 2)
+
+    def add(self, key: str, value: float) -> None:
+        self.attrs[key] = self.attrs.get(key, 0) + value
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        self.duration = time.perf_counter() - self._t0
+        if error is not None:
+            self.error = type(error).__name__
+        if ENABLED:
+            _record(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace": self.trace_id,
+            "span": self.name,
+            "parent": self.parent,
+            "ts": round(self.start, 3),
+            "duration_ms": round(self.duration * 1000, 2),
+            **self.labels,
+            **self.attrs,
+            **({"error": self.error} if self.error else {}),
+        }
+
+
+def current() -> Optional[Span]:
+    return _current.get()
+
+
+def start_span(name: str, **attrs: Any) -> Span:
+    # 활성화하지 않는 span (스트림처럼 여러 번에 걸쳐 끝나는 작업용)
+    return Span(name, _current.get(), **attrs)
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Span]:
+    sp = Span(name, _current.get(), **attrs)
+    token = _current.set(sp)
+    try:
+        yield sp
+    except BaseException as e:
+        sp.finish(e)
+        raise
+    else:
+        sp.finish()
+    finally:
+        try:
+            _current.reset(token)
+        except ValueError:
+            # 제너레이터를 다른 스레드에서 마저 돌린 경우
+            _current.set(None)
+
+
+def traced(name: str, **attrs: Any) -> Callable:
+    # 함수 전체를 span으로 (제너레이터 함수면 끝까지 소비될 때까지)
+    def deco(fn: Callable) -> Callable:
+        if inspect.isgeneratorfunction(fn):
+            @functools.wraps(fn)
+            def gen_wrapper(*args, **kwargs):
+                with span(name, **attrs):
+                    yield from fn(*args, **kwargs)
+            return gen_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name, **attrs):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+
+def traced_stream(name: str, deltas: Iterator[str], **attrs: Any) -> Iterator[str]:
+    # 스트림 전체를 하나의 span으로 - 다음 조각을 당길 때만 활성화 (안쪽 llm span이 라벨을 물려받음)
+    sp = start_span(name, **attrs)
+    it = iter(deltas)
+    while True:
+        token = _current.set(sp)
+        try:
+            d = next(it)
+        except StopIteration:
+            break
+        except BaseException as e:
+            sp.finish(e)
+            raise
+        finally:
+            _current.reset(token)
+        sp.add("bytes", len(d.encode("utf-8")))
+        yield d
+    sp.finish()
+
+
+# -----------------------------
+# 집계 (Prometheus 텍스트)
+# -----------------------------
+_lock = threading.Lock()
+_count: Dict[Tuple, int] = defaultdict(int)
+_sum: Dict[Tuple, float] = defaultdict(float)
+_buckets: Dict[Tuple, List[int]] = defaultdict(lambda: [0] * len(BUCKETS))
+_cache: Dict[Tuple, int] = defaultdict(int)
+_bytes: Dict[Tuple, float] = defaultdict(float)
+_tokens: Dict[Tuple, int] = defaultdict(int)
+_errors: Dict[Tuple, int] = defaultdict(int)
+
+
+def _record(sp: Span) -> None:
+    key = (sp.name, sp.labels.get("bot", ""), sp.labels.get("intent", ""))
+    with _lock:
+        _count[key] += 1
+        _sum[key] += sp.duration
+        for i, b in enumerate(BUCKETS):
+            if sp.duration <= b:
+                _buckets[key][i] += 1
+        if "cache" in sp.attrs:
+            _cache[key + (sp.attrs["cache"],)] += 1
+        if "bytes" in sp.attrs:
+            _bytes[key] += sp.attrs["bytes"]
+        for kind in ("prompt_tokens", "completion_tokens", "cached_tokens"):
+            if sp.attrs.get(kind):
+                _tokens[key + (kind,)] += sp.attrs[kind]
+        # 프롬프트 세그먼트별 (추정) 토큰
+        for seg, n in (sp.attrs.get("segments") or {}).items():
+            _tokens[key + ("prompt:" + seg,)] += n
+        if sp.error:
+            _errors[key] += 1
+
+    if TRACE_PATH:
+        line = json.dumps(sp.to_dict(), ensure_ascii=False, default=str)
+        with _sink_lock, open(TRACE_PATH, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def _labels(key: Tuple, **extra: str) -> str:
+    pairs = {"span": key[0], "bot": key[1], "intent": key[2], **extra}
+    body = ",".join(f'{k}="{str(v).replace(chr(34), "")}"' for k, v in pairs.items() if v != "")
+    return "{" + body + "}"
+
+
+def render_prometheus() -> str:
+    out = [
+        "# TYPE cinematalk_span_duration_seconds histogram",
+    ]
+    with _lock:
+        for key in sorted(_count):
+            for b, n in zip(BUCKETS, _buckets[key]):
+                le = "+Inf" if b == float("inf") else str(b)
+                out.append(f"cinematalk_span_duration_seconds_bucket{_labels(key, le=le)} {n}")
+            out.append(f"cinematalk_span_duration_seconds_sum{_labels(key)} {_sum[key]:.6f}")
+            out.append(f"cinematalk_span_duration_seconds_count{_labels(key)} {_count[key]}")
+
+        out.append("# TYPE cinematalk_span_cache_total counter")
+        for key in sorted(_cache):
+            out.append(f"cinematalk_span_cache_total{_labels(key[:3], result=key[3])} {_cache[key]}")
+
+        out.append("# TYPE cinematalk_span_bytes_total counter")
+        for key in sorted(_bytes):
+            out.append(f"cinematalk_span_bytes_total{_labels(key)} {int(_bytes[key])}")
+
+        out.append("# TYPE cinematalk_llm_tokens_total counter")
+        for key in sorted(_tokens):
+            out.append(f"cinematalk_llm_tokens_total{_labels(key[:3], kind=key[3])} {_tokens[key]}")
+
+        out.append("# TYPE cinematalk_span_errors_total counter")
+        for key in sorted(_errors):
+            out.append(f"cinematalk_span_errors_total{_labels(key)} {_errors[key]}")
+    return "\n".join(out) + "\n"
+
+
+def reset() -> None:
+    with _lock:
+        for d in (_count, _sum, _buckets, _cache, _bytes, _tokens, _errors):
+            d.clear()
+
+
+# -----------------------------
+# /metrics 엔드포인트 (TRACE_METRICS_PORT 있으면 자동 시작)
+# -----------------------------
+_server: Optional[ThreadingHTTPServer] = None
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") != "/metrics":
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve_metrics(port: int, host: str = "0.0.0.0") -> None:
+    global _server
+    if _server is not None:
+        return
+    _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=_server.serve_forever, daemon=True, name="metrics").start()
+
+
+if os.getenv("TRACE_METRICS_PORT"):
+    serve_metrics(int(os.getenv("TRACE_METRICS_PORT", "0")))